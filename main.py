@@ -11,12 +11,15 @@ Genera visualizaciones, animaciones y análisis comparativo.
 
 import sys
 import os
+import json
 
 # Añadir directorio src al path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-from distance_calculator import construir_matriz_distancias, imprimir_matriz
-from exhaustive_search import busqueda_exhaustiva
+from distance_calculator import (ciudades_a_soa, clave_coordenadas,
+                                 construir_matriz_distancias_cache, imprimir_matriz)
+from exhaustive_search import (NUMBA_DISPONIBLE, busqueda_exhaustiva,
+                               historial_busqueda_exhaustiva)
 from nearest_neighbor import vecino_mas_cercano, vecino_mas_cercano_multi_inicio
 from visualizer import (plot_ciclo, crear_animacion_exhaustiva, 
                         crear_animacion_nn, comparar_soluciones)
@@ -70,6 +73,34 @@ def seleccionar_dataset():
             print("Por favor ingrese 1 o 2.")
 
 
+DIRECTORIO_CACHE = 'results/.cache'
+
+
+def cargar_resultado_cache(clave):
+    """
+    Carga el resultado exhaustivo guardado para este dataset (o None).
+    El tiempo no se vuelve a medir: se marca con 'tiempo_en_cache' para que
+    la comparación indique que viene de una ejecución anterior.
+    """
+    ruta = os.path.join(DIRECTORIO_CACHE, f'optimo_{clave}.json')
+    if not os.path.exists(ruta):
+        return None
+    with open(ruta, encoding='utf-8') as archivo:
+        resultado = json.load(archivo)
+    resultado['historial'] = []
+    resultado['tiempo_en_cache'] = True
+    return resultado
+
+
+def guardar_resultado_cache(clave, resultado):
+    """Guarda el resultado exhaustivo (sin historial) para reutilizarlo."""
+    os.makedirs(DIRECTORIO_CACHE, exist_ok=True)
+    ruta = os.path.join(DIRECTORIO_CACHE, f'optimo_{clave}.json')
+    datos = {k: v for k, v in resultado.items() if k not in ('historial', 'tiempo_en_cache')}
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump(datos, archivo)
+
+
 def main():
     """Función principal del programa."""
     
@@ -81,6 +112,14 @@ def main():
     # Seleccionar ciudades
     ciudades = seleccionar_dataset()
     
+    # Coordenadas como arreglo (n, 2) y nombres en una lista paralela
+    coords, nombres = ciudades_a_soa(ciudades)
+    
+    # Preguntar por las animaciones antes de la búsqueda: el historial
+    # solo se registra si se van a generar
+    print("\nNOTA: Las animaciones pueden tardar varios minutos en generarse.")
+    respuesta = input("¿Desea generar las animaciones? (s/n): ").strip().lower()
+    
     # Crear directorio para resultados
     os.makedirs('results', exist_ok=True)
     os.makedirs('results/animaciones', exist_ok=True)
@@ -93,7 +132,9 @@ def main():
     print("-" * 70)
     
     # Usar distancia euclidiana como especifica el enunciado
-    matriz_dist = construir_matriz_distancias(ciudades, metodo='euclid')
+    # (la matriz se guarda en results/.cache y se reutiliza entre ejecuciones)
+    matriz_dist = construir_matriz_distancias_cache(coords, metodo='euclid',
+                                                    directorio=DIRECTORIO_CACHE)
     
     print(f"\nCiudades seleccionadas: {len(ciudades)}")
     print(f"Matriz de distancias D (distancia Euclidiana):\n")
@@ -105,7 +146,24 @@ def main():
     print("\n[2/7] Ejecutando búsqueda exhaustiva...")
     print("-" * 70)
     
-    resultado_exhaustivo = busqueda_exhaustiva(ciudades, matriz_dist, verbose=True)
+    # Se reutiliza el óptimo calculado en una ejecución anterior con las mismas
+    # ciudades y la misma ruta (Numba o NumPy), para que el tiempo y los ciclos
+    # evaluados correspondan a la implementación que se está usando
+    ruta_exhaustiva = 'numba' if NUMBA_DISPONIBLE else 'numpy'
+    clave = f"{clave_coordenadas(coords, metodo='euclid')}_{ruta_exhaustiva}"
+    resultado_exhaustivo = cargar_resultado_cache(clave)
+    
+    if resultado_exhaustivo is not None:
+        print(f"Resultado cargado de {DIRECTORIO_CACHE} "
+              f"(tiempo medido en una ejecución anterior: "
+              f"{resultado_exhaustivo['tiempo_ejecucion']:.4f} segundos)")
+        if respuesta == 's':
+            resultado_exhaustivo['historial'] = historial_busqueda_exhaustiva(matriz_dist,
+                                                                              verbose=True)
+    else:
+        resultado_exhaustivo = busqueda_exhaustiva(ciudades, matriz_dist, verbose=True,
+                                                   registrar_historial=(respuesta == 's'))
+        guardar_resultado_cache(clave, resultado_exhaustivo)
     
     # ========================================================================
     # 3. HEURÍSTICA VECINO MÁS CERCANO
@@ -113,10 +171,11 @@ def main():
     print("\n[3/7] Ejecutando heurística del Vecino Más Cercano...")
     print("-" * 70)
     
-    resultado_nn = vecino_mas_cercano(ciudades, matriz_dist, ciudad_inicio=0, verbose=True)
+    resultado_nn = vecino_mas_cercano((coords, nombres), matriz_dist, ciudad_inicio=0, verbose=True,
+                                      registrar_historial=(respuesta == 's'))
     
     # Opcional: probar desde todas las ciudades
-    # resultado_nn = vecino_mas_cercano_multi_inicio(ciudades, matriz_dist, verbose=True)
+    # resultado_nn = vecino_mas_cercano_multi_inicio((coords, nombres), matriz_dist, verbose=True)
     
     # ========================================================================
     # 4. COMPARACIÓN CUANTITATIVA
@@ -127,9 +186,9 @@ def main():
     comparacion = comparar_metodos(resultado_exhaustivo, resultado_nn, ciudades, verbose=True)
     
     # Guardar tabla de resultados
-    df_resultados = generar_tabla_resultados(comparacion, 
-                                             guardar='results/comparacion.csv')
-    print("\n" + str(df_resultados))
+    filas_resultados = generar_tabla_resultados(comparacion,
+                                                guardar='results/comparacion.csv')
+    print("\n" + '\n'.join(f"{metrica}: {valor}" for metrica, valor in filas_resultados))
     
     # ========================================================================
     # 5. VISUALIZACIÓN DE CICLOS
@@ -137,38 +196,39 @@ def main():
     print("\n[5/7] Generando visualizaciones de ciclos...")
     print("-" * 70)
     
+    # Una sola figura se reutiliza (ax.cla()) para todos los gráficos de un panel
+    fig, ax = plt.subplots(figsize=(12, 8))
+    
     # Ciclo óptimo
-    fig1 = plt.figure(figsize=(12, 8))
-    ax1 = fig1.add_subplot(111)
-    plot_ciclo(ciudades, 
+    plot_ciclo((coords, nombres), 
               resultado_exhaustivo['ciclo_optimo'], 
               resultado_exhaustivo['longitud_optima'],
               titulo="Solución Óptima - Búsqueda Exhaustiva",
               color='green',
-              ax=ax1,
-              guardar='results/graficos/ciclo_optimo.png')
-    plt.close()
+              ax=ax,
+              guardar='results/graficos/ciclo_optimo.png',
+              dpi=150)
     
     # Ciclo heurístico
-    fig2 = plt.figure(figsize=(12, 8))
-    ax2 = fig2.add_subplot(111)
-    plot_ciclo(ciudades, 
+    ax.cla()
+    plot_ciclo((coords, nombres), 
               resultado_nn['ciclo'], 
               resultado_nn['longitud'],
               titulo="Solución Heurística - Vecino Más Cercano",
               color='orange',
-              ax=ax2,
-              guardar='results/graficos/ciclo_heuristico.png')
-    plt.close()
+              ax=ax,
+              guardar='results/graficos/ciclo_heuristico.png',
+              dpi=150)
     
     # Comparación lado a lado
-    fig_comp = comparar_soluciones(ciudades,
+    fig_comp = comparar_soluciones((coords, nombres),
                                    resultado_exhaustivo['ciclo_optimo'],
                                    resultado_exhaustivo['longitud_optima'],
                                    resultado_nn['ciclo'],
                                    resultado_nn['longitud'],
-                                   guardar='results/graficos/comparacion_ciclos.png')
-    plt.close()
+                                   guardar='results/graficos/comparacion_ciclos.png',
+                                   dpi=150)
+    plt.close(fig_comp)
     
     # ========================================================================
     # 6. GRÁFICOS DE COMPARACIÓN
@@ -176,30 +236,30 @@ def main():
     print("\n[6/7] Generando gráficos de comparación...")
     print("-" * 70)
     
+    fig.set_size_inches(10, 6)
+    
     # Comparación de tiempos
-    fig_tiempos = plot_comparacion_tiempos(comparacion, 
-                                           guardar='results/graficos/comparacion_tiempos.png')
-    plt.close()
+    ax.cla()
+    plot_comparacion_tiempos(comparacion, ax=ax,
+                             guardar='results/graficos/comparacion_tiempos.png')
     
     # Comparación de longitudes
-    fig_longitudes = plot_comparacion_longitudes(comparacion,
-                                                 guardar='results/graficos/comparacion_longitudes.png')
-    plt.close()
+    ax.cla()
+    plot_comparacion_longitudes(comparacion, ax=ax,
+                                guardar='results/graficos/comparacion_longitudes.png')
+    plt.close(fig)
     
     # ========================================================================
     # 7. ANIMACIONES (OPCIONAL - PUEDE TOMAR TIEMPO)
     # ========================================================================
     print("\n[7/7] Generando animaciones...")
     print("-" * 70)
-    print("NOTA: Las animaciones pueden tardar varios minutos en generarse.")
-    
-    respuesta = input("\n¿Desea generar las animaciones? (s/n): ").strip().lower()
     
     if respuesta == 's':
         # Animación búsqueda exhaustiva
         print("\nGenerando animación de búsqueda exhaustiva...")
         anim_exhaustiva = crear_animacion_exhaustiva(
-            ciudades,
+            (coords, nombres),
             resultado_exhaustivo['historial'],
             fps=10,
             guardar='results/animaciones/busqueda_exhaustiva.gif'
@@ -209,8 +269,9 @@ def main():
         # Animación vecino más cercano
         print("\nGenerando animación de Vecino Más Cercano...")
         anim_nn = crear_animacion_nn(
-            ciudades,
+            (coords, nombres),
             resultado_nn['historial'],
+            resultado_nn['ciclo'],
             fps=2,
             guardar='results/animaciones/vecino_mas_cercano.gif'
         )
@@ -1,9 +1,12 @@
 """
 Módulo para comparar ambos métodos y generar análisis cuantitativo.
 """
-import pandas as pd
+import csv
+
 import matplotlib.pyplot as plt
-import numpy as np
+
+from distance_calculator import ciudades_a_soa
+from exhaustive_search import contar_ciclos_candidatos
 
 
 def calcular_gap(longitud_nn, longitud_optima):
@@ -27,17 +30,25 @@ def comparar_metodos(resultado_exhaustivo, resultado_nn, ciudades, verbose=True)
     Args:
         resultado_exhaustivo: Diccionario con resultados de búsqueda exhaustiva
         resultado_nn: Diccionario con resultados de vecino más cercano
-        ciudades: Lista de ciudades
+        ciudades: Lista de ciudades, o tupla (coords, nombres)
         verbose: Si True, imprime el análisis completo
     
     Returns:
         dict: Diccionario con todas las métricas de comparación
     """
     # Extraer datos
+    nombres = ciudades_a_soa(ciudades)[1]
+    n = len(nombres)
     long_optima = resultado_exhaustivo['longitud_optima']
     long_nn = resultado_nn['longitud']
     tiempo_exhaustivo = resultado_exhaustivo['tiempo_ejecucion']
+    # Un resultado cargado de la caché trae el tiempo de la ejecución original
+    tiempo_en_cache = resultado_exhaustivo.get('tiempo_en_cache', False)
     tiempo_nn = resultado_nn['tiempo_ejecucion']
+    # Candidatos: tamaño del espacio de búsqueda. Evaluados: ciclos completos
+    # cuya longitud se calculó (menos que los candidatos si hubo poda)
+    # (los resultados guardados en caché antes de existir la clave no la traen)
+    ciclos_candidatos = resultado_exhaustivo.get('ciclos_candidatos', contar_ciclos_candidatos(n))
     ciclos_evaluados = resultado_exhaustivo['ciclos_evaluados']
     
     # Calcular métricas
@@ -46,14 +57,16 @@ def comparar_metodos(resultado_exhaustivo, resultado_nn, ciudades, verbose=True)
     diferencia_absoluta = long_nn - long_optima
     
     comparacion = {
-        'n_ciudades': len(ciudades),
+        'n_ciudades': n,
         'longitud_optima': long_optima,
         'longitud_nn': long_nn,
         'diferencia_absoluta': diferencia_absoluta,
         'gap_porcentaje': gap,
         'tiempo_exhaustivo': tiempo_exhaustivo,
+        'tiempo_exhaustivo_en_cache': tiempo_en_cache,
         'tiempo_nn': tiempo_nn,
         'speedup': speedup,
+        'ciclos_candidatos': ciclos_candidatos,
         'ciclos_evaluados': ciclos_evaluados,
         'ciclo_optimo': resultado_exhaustivo['ciclo_optimo'],
         'ciclo_nn': resultado_nn['ciclo']
@@ -65,8 +78,9 @@ def comparar_metodos(resultado_exhaustivo, resultado_nn, ciudades, verbose=True)
         print(f"{'='*70}\n")
         
         print(f"{'CONFIGURACIÓN':-^70}")
-        print(f"  Número de ciudades (n): {len(ciudades)}")
-        print(f"  Permutaciones evaluadas: {ciclos_evaluados:,}")
+        print(f"  Número de ciudades (n): {n}")
+        print(f"  Ciclos candidatos:          {ciclos_candidatos:,}")
+        print(f"  Ciclos completos evaluados: {ciclos_evaluados:,}")
         
         print(f"\n{'LONGITUDES DE CICLOS':-^70}")
         print(f"  Longitud óptima (L⋆):      {long_optima:12.4f}")
@@ -75,17 +89,18 @@ def comparar_metodos(resultado_exhaustivo, resultado_nn, ciudades, verbose=True)
         print(f"  Gap de optimalidad:        {gap:12.2f}%")
         
         print(f"\n{'TIEMPOS DE EJECUCIÓN':-^70}")
-        print(f"  Búsqueda exhaustiva:       {tiempo_exhaustivo:12.6f} segundos")
+        print(f"  Búsqueda exhaustiva:       {tiempo_exhaustivo:12.6f} segundos"
+              + (" (ejecución anterior, en caché)" if tiempo_en_cache else ""))
         print(f"  Vecino más cercano:        {tiempo_nn:12.6f} segundos")
         print(f"  Speedup (aceleración):     {speedup:12.2f}x más rápido")
         
         print(f"\n{'CICLOS ENCONTRADOS':-^70}")
-        nombres_optimo = ' → '.join([ciudades[i]['nombre'] for i in comparacion['ciclo_optimo']])
-        nombres_nn = ' → '.join([ciudades[i]['nombre'] for i in comparacion['ciclo_nn']])
+        nombres_optimo = ' → '.join([nombres[i] for i in comparacion['ciclo_optimo']])
+        nombres_nn = ' → '.join([nombres[i] for i in comparacion['ciclo_nn']])
         print(f"  Ciclo óptimo π⋆:")
-        print(f"    {nombres_optimo} → {ciudades[comparacion['ciclo_optimo'][0]]['nombre']}")
+        print(f"    {nombres_optimo} → {nombres[comparacion['ciclo_optimo'][0]]}")
         print(f"\n  Ciclo heurístico πNN:")
-        print(f"    {nombres_nn} → {ciudades[comparacion['ciclo_nn'][0]]['nombre']}")
+        print(f"    {nombres_nn} → {nombres[comparacion['ciclo_nn'][0]]}")
         
         print(f"\n{'CONCLUSIONES':-^70}")
         if gap < 5:
@@ -105,60 +120,62 @@ def comparar_metodos(resultado_exhaustivo, resultado_nn, ciudades, verbose=True)
     return comparacion
 
 
-def generar_tabla_resultados(comparacion, guardar=None):
+def generar_tabla_resultados(comparacion, guardar=None, as_dataframe=False):
     """
-    Genera una tabla con los resultados en formato DataFrame.
+    Genera una tabla con los resultados como filas (métrica, valor).
     
     Args:
         comparacion: Diccionario con resultados de la comparación
         guardar: Ruta donde guardar CSV (opcional)
+        as_dataframe: Si True, retorna un pandas.DataFrame (importa pandas)
     
     Returns:
-        pandas.DataFrame: Tabla con los resultados
+        list | pandas.DataFrame: Lista de tuplas (métrica, valor), o DataFrame
+                                 si as_dataframe es True
     """
-    datos = {
-        'Métrica': [
-            'Número de ciudades',
-            'Longitud óptima (L⋆)',
-            'Longitud heurística (LNN)',
-            'Diferencia absoluta',
-            'Gap (%)',
-            'Tiempo exhaustivo (s)',
-            'Tiempo NN (s)',
-            'Speedup (x)',
-            'Ciclos evaluados'
-        ],
-        'Valor': [
-            comparacion['n_ciudades'],
-            f"{comparacion['longitud_optima']:.4f}",
-            f"{comparacion['longitud_nn']:.4f}",
-            f"{comparacion['diferencia_absoluta']:.4f}",
-            f"{comparacion['gap_porcentaje']:.2f}",
-            f"{comparacion['tiempo_exhaustivo']:.6f}",
-            f"{comparacion['tiempo_nn']:.6f}",
-            f"{comparacion['speedup']:.2f}",
-            f"{comparacion['ciclos_evaluados']:,}"
-        ]
-    }
-    
-    df = pd.DataFrame(datos)
+    # El speedup hereda el tiempo en caché: ambas filas lo indican
+    marca_cache = ' [en caché]' if comparacion.get('tiempo_exhaustivo_en_cache') else ''
+    filas = [
+        ('Número de ciudades', comparacion['n_ciudades']),
+        ('Longitud óptima (L⋆)', f"{comparacion['longitud_optima']:.4f}"),
+        ('Longitud heurística (LNN)', f"{comparacion['longitud_nn']:.4f}"),
+        ('Diferencia absoluta', f"{comparacion['diferencia_absoluta']:.4f}"),
+        ('Gap (%)', f"{comparacion['gap_porcentaje']:.2f}"),
+        ('Tiempo exhaustivo (s)' + marca_cache, f"{comparacion['tiempo_exhaustivo']:.6f}"),
+        ('Tiempo NN (s)', f"{comparacion['tiempo_nn']:.6f}"),
+        ('Speedup (x)' + marca_cache, f"{comparacion['speedup']:.2f}"),
+        ('Ciclos candidatos', f"{comparacion['ciclos_candidatos']:,}"),
+        ('Ciclos completos evaluados', f"{comparacion['ciclos_evaluados']:,}")
+    ]
     
     if guardar:
-        df.to_csv(guardar, index=False, encoding='utf-8')
+        with open(guardar, 'w', newline='', encoding='utf-8') as archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow(['Métrica', 'Valor'])
+            escritor.writerows(filas)
         print(f"✓ Tabla guardada: {guardar}")
     
-    return df
+    if as_dataframe:
+        # pandas solo se importa si se pide explícitamente (su carga es costosa)
+        import pandas as pd
+        return pd.DataFrame(filas, columns=['Métrica', 'Valor'])
+    
+    return filas
 
 
-def plot_comparacion_tiempos(comparacion, guardar=None):
+def plot_comparacion_tiempos(comparacion, guardar=None, ax=None):
     """
     Genera un gráfico de barras comparando los tiempos de ejecución.
     
     Args:
         comparacion: Diccionario con resultados
         guardar: Ruta donde guardar la figura (opcional)
+        ax: Axes de matplotlib a reutilizar (opcional)
     """
-    fig, ax = plt.subplots(figsize=(10, 6))
+    if ax is None:
+        fig, ax = plt.subplots(figsize=(10, 6))
+    else:
+        fig = ax.figure
     
     metodos = ['Búsqueda\nExhaustiva', 'Vecino Más\nCercano']
     tiempos = [comparacion['tiempo_exhaustivo'], comparacion['tiempo_nn']]
@@ -180,23 +197,27 @@ def plot_comparacion_tiempos(comparacion, guardar=None):
     ax.grid(True, alpha=0.3, axis='y')
     
     if guardar:
-        plt.tight_layout()
-        plt.savefig(guardar, dpi=150, bbox_inches='tight')
+        fig.tight_layout()
+        fig.savefig(guardar, dpi=150, bbox_inches='tight')
         print(f"✓ Gráfico de tiempos guardado: {guardar}")
     
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
 
 
-def plot_comparacion_longitudes(comparacion, guardar=None):
+def plot_comparacion_longitudes(comparacion, guardar=None, ax=None):
     """
     Genera un gráfico de barras comparando las longitudes de los ciclos.
     
     Args:
         comparacion: Diccionario con resultados
         guardar: Ruta donde guardar la figura (opcional)
+        ax: Axes de matplotlib a reutilizar (opcional)
     """
-    fig, ax = plt.subplots(figsize=(10, 6))
+    if ax is None:
+        fig, ax = plt.subplots(figsize=(10, 6))
+    else:
+        fig = ax.figure
     
     metodos = ['Búsqueda\nExhaustiva (L⋆)', 'Vecino Más\nCercano (LNN)']
     longitudes = [comparacion['longitud_optima'], comparacion['longitud_nn']]
@@ -224,9 +245,9 @@ def plot_comparacion_longitudes(comparacion, guardar=None):
         ax.legend()
     
     if guardar:
-        plt.tight_layout()
-        plt.savefig(guardar, dpi=150, bbox_inches='tight')
+        fig.tight_layout()
+        fig.savefig(guardar, dpi=150, bbox_inches='tight')
         print(f"✓ Gráfico de longitudes guardado: {guardar}")
     
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
@@ -2,7 +2,17 @@
 Módulo para calcular distancias entre ciudades.
 Soporta distancia Euclidiana y Haversine.
 """
+import hashlib
 import math
+import os
+from itertools import chain
+
+import numpy as np
+
+try:
+    from scipy.spatial.distance import pdist, squareform
+except ImportError:  # SciPy es opcional: se usa broadcasting de NumPy
+    pdist = squareform = None
 
 
 def distancia_euclidiana(coord1, coord2):
@@ -48,36 +58,110 @@ def distancia_haversine(coord1, coord2):
     return R * c
 
 
-def construir_matriz_distancias(ciudades, metodo='euclid'):
+def ciudades_a_soa(ciudades):
+    """
+    Convierte la lista de ciudades (lista de diccionarios) en arreglos paralelos.
+    
+    Args:
+        ciudades: Lista de diccionarios con 'nombre' y 'coords', o una tupla
+                  (coords, nombres) ya convertida, que se retorna sin cambios
+    
+    Returns:
+        tuple: (coords, nombres) donde coords es un numpy.ndarray (n, 2) con
+               (latitud, longitud) y nombres es una lista de str
+    """
+    if isinstance(ciudades, tuple):
+        return ciudades
+    
+    # Un solo recorrido sobre los diccionarios, sin lista intermedia de tuplas
+    n = len(ciudades)
+    coords = np.fromiter(chain.from_iterable(c['coords'] for c in ciudades),
+                         dtype=np.float64, count=2 * n).reshape(n, 2)
+    nombres = [c['nombre'] for c in ciudades]
+    return coords, nombres
+
+
+def construir_matriz_distancias(ciudades, metodo='euclid', dtype=np.float64):
     """
     Construye la matriz de distancias D entre todas las ciudades.
     
     Args:
-        ciudades: Lista de diccionarios con 'nombre' y 'coords'
+        ciudades: Arreglo (n, 2) de coordenadas, o lista de diccionarios con
+                  'nombre' y 'coords'
         metodo: 'euclid' para distancia euclidiana, 'haversine' para distancia real
+        dtype: Tipo numérico de la matriz (np.float64 por defecto; np.float32
+               reduce a la mitad la memoria recorrida en la búsqueda exhaustiva)
     
     Returns:
-        list: Matriz n×n con distancias entre todos los pares de ciudades
+        numpy.ndarray: Matriz n×n con distancias entre todos los pares de ciudades
     """
-    metodos = {
-        'euclid': distancia_euclidiana,
-        'haversine': distancia_haversine
-    }
-    
-    if metodo not in metodos:
+    if metodo not in ('euclid', 'haversine'):
         raise ValueError(f"Método desconocido: '{metodo}'. Use 'euclid' o 'haversine'")
     
-    func_distancia = metodos[metodo]
-    n = len(ciudades)
-    matriz = [[0.0 for _ in range(n)] for _ in range(n)]
+    if isinstance(ciudades, np.ndarray):
+        coords = np.asarray(ciudades, dtype=np.float64)
+    else:
+        coords, _ = ciudades_a_soa(ciudades)
+    
+    if metodo == 'euclid' and pdist is not None:
+        # pdist calcula solo los n(n-1)/2 pares únicos (matriz simétrica)
+        matriz = squareform(pdist(coords, metric='euclidean'))
+    elif metodo == 'euclid':
+        # Diferencias entre todos los pares mediante broadcasting: (n, n, 2)
+        diff = coords[:, None, :] - coords[None, :, :]
+        matriz = np.sqrt(np.einsum('ijk,ijk->ij', diff, diff))
+    else:
+        R = 6371.0  # Radio medio de la Tierra en km
+        coords_rad = np.radians(coords)
+        lat = coords_rad[:, 0]
+        lon = coords_rad[:, 1]
+        cos_lat = np.cos(lat)  # un coseno por ciudad, no uno por par
+        dlat = lat[None, :] - lat[:, None]
+        dlon = lon[None, :] - lon[:, None]
+        a = (np.sin(dlat / 2) ** 2
+             + cos_lat[:, None] * cos_lat[None, :] * np.sin(dlon / 2) ** 2)
+        matriz = R * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    
+    np.fill_diagonal(matriz, 0.0)
+    return np.ascontiguousarray(matriz, dtype=dtype)
+
+
+def clave_coordenadas(coords, metodo='euclid'):
+    """
+    Genera una clave corta que identifica un conjunto de coordenadas y un método.
     
-    for i in range(n):
-        for j in range(n):
-            if i == j:
-                matriz[i][j] = 0.0
-            else:
-                matriz[i][j] = func_distancia(ciudades[i]['coords'], ciudades[j]['coords'])
+    Args:
+        coords: Arreglo (n, 2) de coordenadas
+        metodo: Método de distancia ('euclid' o 'haversine')
     
+    Returns:
+        str: Hash hexadecimal de 12 caracteres
+    """
+    h = hashlib.sha1(np.ascontiguousarray(coords, dtype=np.float64).tobytes())
+    h.update(metodo.encode())
+    return h.hexdigest()[:12]
+
+
+def construir_matriz_distancias_cache(coords, metodo='euclid', directorio='results/.cache'):
+    """
+    Igual que construir_matriz_distancias, pero guarda la matriz en disco
+    (np.save) y la reutiliza en ejecuciones posteriores con las mismas ciudades.
+    
+    Args:
+        coords: Arreglo (n, 2) de coordenadas
+        metodo: 'euclid' o 'haversine'
+        directorio: Carpeta donde se guardan las matrices
+    
+    Returns:
+        numpy.ndarray: Matriz n×n de distancias
+    """
+    ruta = os.path.join(directorio, f'D_{clave_coordenadas(coords, metodo)}.npy')
+    if os.path.exists(ruta):
+        return np.load(ruta)
+    
+    matriz = construir_matriz_distancias(coords, metodo=metodo)
+    os.makedirs(directorio, exist_ok=True)
+    np.save(ruta, matriz)
     return matriz
 
 
@@ -86,11 +170,11 @@ def imprimir_matriz(matriz, ciudades, decimales=2):
     Imprime la matriz de distancias con formato legible.
     
     Args:
-        matriz: Matriz de distancias
-        ciudades: Lista de ciudades
+        matriz: Matriz de distancias (ndarray o lista de listas)
+        ciudades: Lista de ciudades, o tupla (coords, nombres)
         decimales: Número de decimales a mostrar
     """
-    nombres = [c['nombre'] for c in ciudades]
+    nombres = ciudades_a_soa(ciudades)[1]
     ancho = max(len(n) for n in nombres) + 2
     
     # Imprimir cabecera
@@ -100,7 +184,7 @@ def imprimir_matriz(matriz, ciudades, decimales=2):
     print()
     
     # Imprimir filas
-    for nombre, fila in zip(nombres, matriz):
+    for nombre, fila in zip(nombres, np.asarray(matriz).tolist()):
         print(f'{nombre:<{ancho}}', end='')
         for valor in fila:
             print(f'{valor:>12.{decimales}f}', end='')
@@ -3,7 +3,17 @@ Búsqueda exhaustiva para el Problema del Viajante (TSP).
 Este algoritmo garantiza encontrar la solución óptima pero tiene complejidad O((n-1)!/2).
 """
 import time
-from itertools import permutations
+from itertools import chain, islice, permutations
+
+import numpy as np
+
+from distance_calculator import ciudades_a_soa
+
+try:
+    from numba import njit, prange
+    NUMBA_DISPONIBLE = True
+except ImportError:  # Numba es opcional: sin él se usa el recorrido en Python
+    NUMBA_DISPONIBLE = False
 
 
 def calcular_longitud_ciclo(ciclo, matriz_dist):
@@ -12,11 +22,17 @@ def calcular_longitud_ciclo(ciclo, matriz_dist):
     
     Args:
         ciclo: Lista de índices representando el orden de visita
-        matriz_dist: Matriz de distancias entre ciudades
+        matriz_dist: Matriz de distancias entre ciudades (ndarray o lista de listas)
     
     Returns:
         float: Longitud total del ciclo
     """
+    if isinstance(matriz_dist, np.ndarray):
+        # Un solo gather de las n aristas (i → siguiente) y una suma en C
+        c = np.asarray(ciclo, dtype=np.intp)
+        siguiente = np.r_[c[1:], c[:1]]
+        return float(matriz_dist[c, siguiente].sum())
+    
     longitud = 0.0
     n = len(ciclo)
     
@@ -28,80 +44,432 @@ def calcular_longitud_ciclo(ciclo, matriz_dist):
     return longitud
 
 
-def busqueda_exhaustiva(ciudades, matriz_dist, verbose=True):
+def contar_ciclos_candidatos(n, simetrica=True):
     """
-    Encuentra el ciclo Hamiltoniano óptimo mediante búsqueda exhaustiva.
+    Número de ciclos distintos entre n ciudades: (n-1)!/2 con la ciudad 0 fija
+    y cada ciclo contado en un solo sentido, o (n-1)! si la matriz no es
+    simétrica (un ciclo y su reverso tienen entonces longitudes distintas).
     
     Args:
-        ciudades: Lista de ciudades
-        matriz_dist: Matriz de distancias
-        verbose: Si True, muestra progreso durante la búsqueda
+        n: Número de ciudades
+        simetrica: Si la matriz de distancias es simétrica
     
     Returns:
-        dict: Contiene 'ciclo_optimo', 'longitud_optima', 'tiempo_ejecucion',
-              'ciclos_evaluados' y 'historial' (para visualización)
+        int: Ciclos candidatos del espacio de búsqueda
     """
-    n = len(ciudades)
-    inicio_tiempo = time.time()
+    total = 1
+    for i in range(1, n):
+        total *= i
+    return total // 2 if simetrica and n > 2 else total
+
+
+def _es_simetrica(matriz_dist):
+    """Indica si D[i][j] == D[j][i] (con tolerancia) para todo par de ciudades."""
+    D = np.asarray(matriz_dist, dtype=np.float64)
+    return np.allclose(D, D.T)
+
+
+# Límite de la máscara de bits int64 de ciudades visitadas en el kernel compilado
+MAX_CIUDADES = 63
+
+# Por debajo de este número de ciudades el costo de lanzar hilos supera la ganancia
+UMBRAL_PARALELO = 10
+
+
+if NUMBA_DISPONIBLE:
+    # El ciclo del vecino más cercano sirve como cota inicial de la poda
+    from nearest_neighbor import recorrido_nn_compilado
+
+    @njit(cache=True)
+    def _minimos_por_fila(D):
+        """Arista de salida más corta de cada ciudad (sin contar la diagonal)."""
+        n = D.shape[0]
+        fila_min = np.full(n, np.inf)
+        for i in range(n):
+            for j in range(n):
+                if i != j and D[i, j] < fila_min[i]:
+                    fila_min[i] = D[i, j]
+        return fila_min
+
+    @njit(cache=True)
+    def _recorrer_rama(D, fila_min, k, cota, simetrica):
+        """
+        Explora los ciclos con la ciudad 0 fija y la ciudad k como segunda
+        parada mediante búsqueda en profundidad con ramificación y poda:
+        un camino parcial se abandona en cuanto su longitud alcanza la del
+        mejor ciclo conocido. La cota suma, además, la arista de salida más
+        corta de cada ciudad que aún debe abandonarse. Las ciudades
+        visitadas se marcan en una máscara de bits.
+        
+        Args:
+            D: Matriz de distancias (numpy.ndarray float32 o float64 de n×n)
+            fila_min: Arista de salida más corta de cada ciudad
+            k: Ciudad que se visita justo después de la ciudad 0
+            cota: Longitud de un ciclo conocido; solo se buscan ciclos más cortos
+            simetrica: Si es True, se descarta el reverso de cada ciclo
+                       (solo es correcto con una matriz simétrica)
+        
+        Returns:
+            tuple: (mejor_ciclo, mejor_longitud, ciclos_evaluados) de la rama,
+                   donde ciclos_evaluados cuenta los ciclos completos cerrados.
+                   Si ningún ciclo mejora la cota, mejor_longitud es la cota
+        """
+        n = D.shape[0]
+        camino = np.zeros(n, np.int64)
+        parcial = np.zeros(n, D.dtype)  # longitud acumulada hasta camino[pos]
+        pendiente = np.zeros(n)  # suma de fila_min de las ciudades no visitadas
+        candidato = np.ones(n + 1, np.int64)  # próxima ciudad a probar en cada posición
+        
+        # La arista inicial 0 → k es común a toda la rama
+        camino[1] = k
+        parcial[1] = D[0, k]
+        pendiente[1] = fila_min.sum() - fila_min[0] - fila_min[k]
+        visitadas = 1 | (1 << k)
+        
+        mejor_longitud = cota
+        mejor_ciclo = np.zeros(n, np.int64)
+        ciclos_evaluados = 0
+        
+        pos = 2
+        while pos >= 2:
+            if pos == n:
+                # Cerrar el ciclo volviendo a la ciudad 0
+                longitud = parcial[n - 1] + D[camino[n - 1], 0]
+                ciclos_evaluados += 1
+                if longitud < mejor_longitud:
+                    mejor_longitud = longitud
+                    mejor_ciclo[:] = camino
+                avanzo = False
+            else:
+                avanzo = False
+                ciudad = candidato[pos]
+                # Por simetría solo se consideran ciclos con camino[1] < camino[n-1]:
+                # en la última posición se descartan las ciudades menores que k
+                if simetrica and pos == n - 1 and ciudad < k:
+                    ciudad = k + 1
+                while ciudad < n:
+                    if not (visitadas >> ciudad) & 1:
+                        nueva = parcial[pos - 1] + D[camino[pos - 1], ciudad]
+                        if nueva + pendiente[pos - 1] < mejor_longitud:
+                            camino[pos] = ciudad
+                            parcial[pos] = nueva
+                            pendiente[pos] = pendiente[pos - 1] - fila_min[ciudad]
+                            visitadas |= 1 << ciudad
+                            candidato[pos] = ciudad + 1
+                            pos += 1
+                            candidato[pos] = 1
+                            avanzo = True
+                            break
+                    ciudad += 1
+            
+            if not avanzo:
+                # Retroceder: liberar la ciudad de la posición anterior
+                pos -= 1
+                if pos >= 2:
+                    visitadas &= ~(1 << camino[pos])
+        
+        return mejor_ciclo, mejor_longitud, ciclos_evaluados
+
+    @njit(cache=True)
+    def _busqueda_exhaustiva_jit(D, simetrica):
+        """
+        Búsqueda exhaustiva compilada, recorriendo las ramas en serie.
+        
+        Returns:
+            tuple: (mejores_ciclos, mejores_longitudes, evaluados, ciclo_inicial, cota),
+                   con los resultados de cada rama k en la fila/posición k
+        """
+        n = D.shape[0]
+        mejores_longitudes = np.full(n, np.inf)
+        mejores_ciclos = np.zeros((n, n), np.int64)
+        evaluados = np.zeros(n, np.int64)
+        fila_min = _minimos_por_fila(D)
+        ciclo_inicial, cota = recorrido_nn_compilado(D, 0)
+        
+        for k in range(1, n):
+            ciclo, longitud, cuenta = _recorrer_rama(D, fila_min, k, cota, simetrica)
+            mejores_ciclos[k] = ciclo
+            mejores_longitudes[k] = longitud
+            evaluados[k] = cuenta
+        
+        return mejores_ciclos, mejores_longitudes, evaluados, ciclo_inicial, cota
+
+    @njit(cache=True, parallel=True)
+    def _busqueda_exhaustiva_paralela(D, simetrica):
+        """
+        Búsqueda exhaustiva compilada, repartiendo las n-1 ramas (una por
+        cada posible segunda ciudad) entre hilos con prange. No hay ningún
+        print dentro del kernel: el progreso se informa desde Python al terminar.
+        
+        Returns:
+            tuple: (mejores_ciclos, mejores_longitudes, evaluados, ciclo_inicial, cota),
+                   con los resultados de cada rama k en la fila/posición k
+        """
+        n = D.shape[0]
+        mejores_longitudes = np.full(n, np.inf)
+        mejores_ciclos = np.zeros((n, n), np.int64)
+        evaluados = np.zeros(n, np.int64)
+        fila_min = _minimos_por_fila(D)
+        ciclo_inicial, cota = recorrido_nn_compilado(D, 0)
+        
+        # Cada hilo escribe solo en la fila k: no hay sincronización
+        for k in prange(1, n):
+            ciclo, longitud, cuenta = _recorrer_rama(D, fila_min, k, cota, simetrica)
+            mejores_ciclos[k] = ciclo
+            mejores_longitudes[k] = longitud
+            evaluados[k] = cuenta
+        
+        return mejores_ciclos, mejores_longitudes, evaluados, ciclo_inicial, cota
+
+
+def _busqueda_exhaustiva_python(matriz_dist, n, total_permutaciones, verbose, registrar_historial,
+                                simetrica=True):
+    """
+    Recorrido en Python puro de todas las permutaciones (registra historial).
+    Con simetrica=True se omite el reverso de cada ciclo.
     
+    Returns:
+        tuple: (mejor_ciclo, mejor_longitud, ciclos_evaluados, historial)
+    """
     # Fijamos la primera ciudad (ciudad 0) para evitar ciclos equivalentes
     # Solo permutamos las ciudades restantes
     indices = list(range(1, n))
     
+    # En un bucle Python el acceso escalar a listas es más rápido que a un ndarray
+    if isinstance(matriz_dist, np.ndarray):
+        matriz_dist = matriz_dist.tolist()
+    
     mejor_ciclo = None
     mejor_longitud = float('inf')
     ciclos_evaluados = 0
+    historial = []
+    
+    # Con una sola ciudad no hay ramas: el único ciclo es [0]
+    if n < 2:
+        mejor_ciclo = list(range(n))
+        mejor_longitud = calcular_longitud_ciclo(mejor_ciclo, matriz_dist)
+        if registrar_historial:
+            historial.append({
+                'ciclo': mejor_ciclo.copy(),
+                'longitud': mejor_longitud,
+                'es_mejor': True,
+                'iteracion': 1
+            })
+        return mejor_ciclo, mejor_longitud, 1, historial
+    
+    # Con k < última ciudad, la rama k = n-1 no tiene ningún ciclo válido
+    ramas = indices[:-1] if simetrica and n > 2 else indices
+    
+    # Recorrer por ramas (segunda ciudad k) para informar el progreso una vez
+    # por rama, fuera del bucle de permutaciones
+    for rama, k in enumerate(ramas, start=1):
+        resto = [c for c in indices if c != k]
+        
+        # Buffer reutilizado: el ciclo se reescribe en su lugar en cada permutación
+        ciclo = [0, k] + resto
+        
+        for perm_resto in permutations(resto):
+            # Un ciclo y su reverso tienen igual longitud: basta con k < última ciudad
+            if simetrica and resto and k > perm_resto[-1]:
+                continue
+            
+            # Completar el ciclo que comienza en la ciudad 0
+            ciclo[2:] = perm_resto
+            longitud = calcular_longitud_ciclo(ciclo, matriz_dist)
+            ciclos_evaluados += 1
+            
+            # Actualizar si encontramos un mejor ciclo (solo aquí se copia)
+            if longitud < mejor_longitud:
+                mejor_longitud = longitud
+                mejor_ciclo = ciclo.copy()
+                
+                # Guardar para visualización (solo las mejoras, que es lo que se anima)
+                if registrar_historial:
+                    historial.append({
+                        'ciclo': ciclo.copy(),
+                        'longitud': longitud,
+                        'es_mejor': True,
+                        'iteracion': ciclos_evaluados
+                    })
+        
+        if verbose:
+            progreso = (ciclos_evaluados / total_permutaciones) * 100
+            print(f"Progreso: {progreso:5.1f}% | Rama {rama}/{len(ramas)} | "
+                  f"Ciclos evaluados: {ciclos_evaluados:,} | "
+                  f"Mejor hasta ahora: {mejor_longitud:.4f}")
+    
+    return mejor_ciclo, mejor_longitud, ciclos_evaluados, historial
+
+
+def _busqueda_exhaustiva_numpy(matriz_dist, tam_bloque=100_000, simetrica=True):
+    """
+    Alternativa sin Numba: evalúa las permutaciones por bloques con indexado
+    avanzado de NumPy en lugar de un bucle Python por permutación.
+    
+    Args:
+        matriz_dist: Matriz de distancias (numpy.ndarray de n×n)
+        tam_bloque: Número de permutaciones materializadas por bloque
+        simetrica: Si es True, se descarta el reverso de cada ciclo
+    
+    Returns:
+        tuple: (mejor_ciclo, mejor_longitud, ciclos_evaluados)
+    """
+    D = np.asarray(matriz_dist, dtype=np.float64)
+    n = D.shape[0]
+    
+    # Con menos de 3 ciudades hay un único ciclo
+    if n < 3:
+        ciclo = list(range(n))
+        return ciclo, calcular_longitud_ciclo(ciclo, D), 1
+    
+    mejor_ciclo = None
+    mejor_longitud = float('inf')
+    ciclos_evaluados = 0
+    
+    # Una rama por segunda ciudad k; con simetría la rama k = n-1 se omite
+    # porque ningún ciclo suyo cumple k < última ciudad
+    for k in range(1, n - 1 if simetrica else n):
+        perms_restantes = permutations([c for c in range(1, n) if c != k])
+        
+        while True:
+            bloque = np.fromiter(chain.from_iterable(islice(perms_restantes, tam_bloque)),
+                                 dtype=np.int32)
+            if bloque.size == 0:
+                break
+            resto = bloque.reshape(-1, n - 2)
+            # Descartar los ciclos reversos (simétricos) de otros ya evaluados
+            if simetrica:
+                resto = resto[resto[:, -1] > k]
+            if len(resto) == 0:
+                continue
+            perms = np.column_stack([np.full(len(resto), k, dtype=np.int32), resto])
+            
+            # Arista de salida desde 0, aristas internas y arista de regreso a 0
+            longitudes = (D[0, k]
+                          + D[perms[:, :-1], perms[:, 1:]].sum(axis=1)
+                          + D[perms[:, -1], 0])
+            ciclos_evaluados += len(perms)
+            
+            i = int(longitudes.argmin())
+            if longitudes[i] < mejor_longitud:
+                mejor_longitud = float(longitudes[i])
+                mejor_ciclo = [0] + perms[i].tolist()
+    
+    return mejor_ciclo, mejor_longitud, ciclos_evaluados
+
+
+def historial_busqueda_exhaustiva(matriz_dist, verbose=False):
+    """
+    Recorre en Python todos los ciclos candidatos solo para registrar cada
+    mejora encontrada (el historial de la animación). Es lento: no forma
+    parte del tiempo medido por busqueda_exhaustiva.
+    
+    Args:
+        matriz_dist: Matriz de distancias
+        verbose: Si True, muestra el progreso por rama
+    
+    Returns:
+        list: Historial de mejoras (dicts con 'ciclo', 'longitud', 'es_mejor'
+              e 'iteracion')
+    """
+    n = len(matriz_dist)
+    simetrica = _es_simetrica(matriz_dist)
+    return _busqueda_exhaustiva_python(matriz_dist, n, contar_ciclos_candidatos(n, simetrica),
+                                       verbose, True, simetrica)[3]
+
+
+def busqueda_exhaustiva(ciudades, matriz_dist, verbose=True, registrar_historial=False):
+    """
+    Encuentra el ciclo Hamiltoniano óptimo mediante búsqueda exhaustiva.
+    
+    Args:
+        ciudades: Lista de ciudades, o tupla (coords, nombres)
+        matriz_dist: Matriz de distancias
+        verbose: Si True, muestra progreso durante la búsqueda
+        registrar_historial: Si True, guarda en el historial cada mejora encontrada
+            (necesario para la animación). El óptimo y el tiempo salen siempre del
+            kernel compilado con Numba (o, sin Numba, de la evaluación por bloques
+            con NumPy); el historial se obtiene después con
+            historial_busqueda_exhaustiva, que no se cronometra
+    
+    Si la matriz es simétrica, cada ciclo se evalúa en un solo sentido; si
+    no lo es, se evalúan ambos sentidos para no perder el óptimo.
+    
+    Returns:
+        dict: Contiene 'ciclo_optimo', 'longitud_optima', 'tiempo_ejecucion',
+              'ciclos_candidatos', 'ciclos_evaluados' y 'historial' (para
+              visualización). 'ciclos_evaluados' cuenta los ciclos completos
+              cuya longitud se calculó: con Numba la poda descarta la mayoría
+              de los candidatos, sin Numba se evalúan todos
+    """
+    nombres = ciudades_a_soa(ciudades)[1]
+    n = len(nombres)
+    if n > MAX_CIUDADES:
+        # El kernel marca las ciudades visitadas en una máscara int64
+        raise ValueError(f"La búsqueda exhaustiva admite hasta {MAX_CIUDADES} ciudades "
+                         f"(se recibieron {n})")
+    inicio_tiempo = time.time()
+    
     historial = []  # Para visualización: (ciclo, longitud, es_mejor)
     
-    total_permutaciones = 1
-    for i in range(1, n):
-        total_permutaciones *= i
+    # Un ciclo y su reverso solo miden lo mismo si D es simétrica
+    simetrica = _es_simetrica(matriz_dist)
+    total_permutaciones = contar_ciclos_candidatos(n, simetrica)
     
     if verbose:
         print(f"\n{'='*60}")
         print(f"BÚSQUEDA EXHAUSTIVA - TSP")
         print(f"{'='*60}")
         print(f"Ciudades: {n}")
-        print(f"Permutaciones a evaluar: {total_permutaciones:,}")
+        print(f"Ciclos candidatos ({'(n-1)!/2' if simetrica else '(n-1)!, matriz asimétrica'}): "
+              f"{total_permutaciones:,}")
         print(f"{'='*60}\n")
     
-    # Generar todas las permutaciones
-    for perm in permutations(indices):
-        # Construir ciclo completo comenzando desde ciudad 0
-        ciclo = [0] + list(perm)
-        longitud = calcular_longitud_ciclo(ciclo, matriz_dist)
-        ciclos_evaluados += 1
-        
-        # Actualizar si encontramos un mejor ciclo
-        es_mejor = False
-        if longitud < mejor_longitud:
-            mejor_longitud = longitud
-            mejor_ciclo = ciclo.copy()
-            es_mejor = True
-            
-            if verbose and ciclos_evaluados % max(1, total_permutaciones // 20) == 0:
-                progreso = (ciclos_evaluados / total_permutaciones) * 100
-                print(f"Progreso: {progreso:5.1f}% | Ciclos evaluados: {ciclos_evaluados:,} | "
-                      f"Mejor hasta ahora: {mejor_longitud:.4f}")
+    if NUMBA_DISPONIBLE:
+        # float32 basta para comparar ciclos y reduce la memoria recorrida;
+        # la longitud del ciclo ganador se recalcula con la matriz original
+        D = np.ascontiguousarray(matriz_dist, dtype=np.float32)
+        kernel = _busqueda_exhaustiva_paralela if n >= UMBRAL_PARALELO else _busqueda_exhaustiva_jit
+        ciclos_rama, longitudes_rama, evaluados_rama, ciclo_inicial, cota = kernel(D, simetrica)
         
-        # Guardar para visualización (solo algunos para no saturar memoria)
-        if ciclos_evaluados <= 1000 or es_mejor:
-            historial.append({
-                'ciclo': ciclo.copy(),
-                'longitud': longitud,
-                'es_mejor': es_mejor,
-                'iteracion': ciclos_evaluados
-            })
+        mejor = int(np.argmin(longitudes_rama))
+        if longitudes_rama[mejor] >= cota:
+            # Ninguna rama mejoró el ciclo inicial: este ya es óptimo
+            ciclo_jit = ciclo_inicial
+        else:
+            ciclo_jit = ciclos_rama[mejor]
+        mejor_ciclo = ciclo_jit.tolist()
+        mejor_longitud = calcular_longitud_ciclo(mejor_ciclo, np.asarray(matriz_dist, dtype=np.float64))
+        ciclos_evaluados = int(evaluados_rama.sum())
+        
+        if verbose:
+            # Resumen por rama, una vez terminada la región compilada
+            for k in range(1, n):
+                mejora = (f"{longitudes_rama[k]:.4f}" if longitudes_rama[k] < cota
+                          else "sin mejora")
+                print(f"Rama {nombres[0]} → {nombres[k]:12} | "
+                      f"Ciclos cerrados: {evaluados_rama[k]:,} | Mejor: {mejora}")
+    else:
+        mejor_ciclo, mejor_longitud, ciclos_evaluados = _busqueda_exhaustiva_numpy(
+            matriz_dist, simetrica=simetrica)
     
     tiempo_ejecucion = time.time() - inicio_tiempo
     
+    if registrar_historial:
+        # Recorrido aparte, fuera del tiempo medido, solo para la animación
+        if verbose:
+            print("\nRegistrando historial para la animación (no cronometrado)...")
+        historial = _busqueda_exhaustiva_python(
+            matriz_dist, n, total_permutaciones, verbose, True, simetrica)[3]
+    
     if verbose:
         print(f"\n{'='*60}")
         print(f"RESULTADO ÓPTIMO ENCONTRADO")
         print(f"{'='*60}")
-        print(f"Ciclo óptimo π⋆: {' → '.join([ciudades[i]['nombre'] for i in mejor_ciclo])} → {ciudades[mejor_ciclo[0]]['nombre']}")
+        print(f"Ciclo óptimo π⋆: {' → '.join([nombres[i] for i in mejor_ciclo])} → {nombres[mejor_ciclo[0]]}")
         print(f"Longitud óptima L⋆: {mejor_longitud:.4f}")
-        print(f"Ciclos evaluados: {ciclos_evaluados:,}")
+        print(f"Ciclos completos evaluados: {ciclos_evaluados:,}"
+              + (" (el resto se descartó por poda)" if ciclos_evaluados < total_permutaciones else ""))
         print(f"Tiempo de ejecución: {tiempo_ejecucion:.4f} segundos")
         print(f"{'='*60}\n")
     
@@ -109,6 +477,7 @@ def busqueda_exhaustiva(ciudades, matriz_dist, verbose=True):
         'ciclo_optimo': mejor_ciclo,
         'longitud_optima': mejor_longitud,
         'tiempo_ejecucion': tiempo_ejecucion,
+        'ciclos_candidatos': total_permutaciones,
         'ciclos_evaluados': ciclos_evaluados,
         'historial': historial
     }
@@ -120,9 +489,10 @@ def obtener_ruta_legible(ciclo, ciudades):
     
     Args:
         ciclo: Lista de índices
-        ciudades: Lista de ciudades
+        ciudades: Lista de ciudades, o tupla (coords, nombres)
     
     Returns:
         list: Lista de nombres de ciudades en orden
     """
-    return [ciudades[i]['nombre'] for i in ciclo]
+    nombres = ciudades_a_soa(ciudades)[1]
+    return [nombres[i] for i in ciclo]
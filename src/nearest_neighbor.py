@@ -2,10 +2,167 @@
 Heurística del Vecino Más Cercano para el TSP.
 Algoritmo greedy con complejidad O(n²) que construye una solución aproximada.
 """
-import time
+from collections import namedtuple
+from time import perf_counter
 
+import numpy as np
 
-def vecino_mas_cercano(ciudades, matriz_dist, ciudad_inicio=0, verbose=True):
+from distance_calculator import ciudades_a_soa, construir_matriz_distancias
+
+# Un paso del recorrido para la animación. El ciclo parcial no se guarda:
+# tras el paso p es ciclo[:p + 1] (con ciclo cerrado al final en el paso n)
+PasoNN = namedtuple('PasoNN', ['paso', 'origen', 'destino', 'distancia', 'longitud_acumulada'])
+
+try:
+    from numba import njit, prange
+    NUMBA_DISPONIBLE = True
+except ImportError:  # Numba es opcional: sin él se usa la versión con NumPy
+    NUMBA_DISPONIBLE = False
+
+
+if NUMBA_DISPONIBLE:
+    @njit(cache=True, boundscheck=False)
+    def _nn_into(D, inicio, visitadas, ciclo):
+        """
+        Núcleo compilado del Vecino Más Cercano: un único recorrido por fila
+        que combina la prueba de visitada, el mínimo y la actualización.
+        Escribe en buffers preasignados para poder reutilizarlos.
+        
+        Args:
+            D: Matriz de distancias (numpy.ndarray de n×n)
+            inicio: Índice de la ciudad inicial
+            visitadas: Buffer bool de n elementos, todo en False al entrar
+            ciclo: Buffer int64 de n elementos donde se escribe el ciclo
+        
+        Returns:
+            float: Longitud del ciclo
+        """
+        n = D.shape[0]
+        ciclo[0] = inicio
+        visitadas[inicio] = True
+        actual = ciclo[0]  # int64 aunque inicio llegue como índice sin signo de prange
+        longitud = 0.0
+        for paso in range(1, n):
+            mejor = -1
+            mejor_distancia = np.inf
+            fila = D[actual]
+            for j in range(n):
+                if not visitadas[j] and fila[j] < mejor_distancia:
+                    mejor_distancia = fila[j]
+                    mejor = j
+            ciclo[paso] = mejor
+            visitadas[mejor] = True
+            longitud += mejor_distancia
+            actual = mejor
+        longitud += D[actual, ciclo[0]]
+        return longitud
+
+    @njit(cache=True, boundscheck=False)
+    def _nn_into_ordenado(D, vecinos, inicio, visitadas, ciclo):
+        """
+        Igual que _nn_into, pero con las filas de vecinos ya ordenadas por
+        distancia: en cada paso basta con avanzar hasta el primer vecino no
+        visitado, en vez de recorrer la fila completa. Las comparaciones ya
+        están hechas en vecinos; D solo se usa para sumar la longitud.
+        
+        Args:
+            D: Matriz de distancias (numpy.ndarray de n×n)
+            vecinos: Índices de cada fila ordenados por distancia creciente
+            inicio: Índice de la ciudad inicial
+            visitadas: Buffer bool de n elementos, todo en False al entrar
+            ciclo: Buffer int64 de n elementos donde se escribe el ciclo
+        
+        Returns:
+            float: Longitud del ciclo
+        """
+        n = D.shape[0]
+        ciclo[0] = inicio
+        visitadas[inicio] = True
+        actual = ciclo[0]
+        longitud = 0.0
+        for paso in range(1, n):
+            fila = vecinos[actual]
+            j = 0
+            while visitadas[fila[j]]:
+                j += 1
+            mejor = fila[j]
+            ciclo[paso] = mejor
+            visitadas[mejor] = True
+            longitud += D[actual, mejor]
+            actual = ciclo[paso]
+        longitud += D[actual, ciclo[0]]
+        return longitud
+
+    @njit(cache=True)
+    def recorrido_nn_compilado(D, inicio):
+        """
+        Vecino Más Cercano compilado con buffers propios. Puede llamarse desde
+        otras funciones compiladas con Numba (la búsqueda exhaustiva lo usa
+        como cota inicial de la poda).
+        
+        Returns:
+            tuple: (ciclo, longitud) con ciclo como ndarray int64 de n elementos
+        """
+        n = D.shape[0]
+        ciclo = np.empty(n, np.int64)
+        longitud = _nn_into(D, inicio, np.zeros(n, np.bool_), ciclo)
+        return ciclo, longitud
+
+    @njit(cache=True, parallel=True)
+    def _nn_todos_los_inicios(D, vecinos):
+        """
+        Ejecuta el Vecino Más Cercano desde cada ciudad, repartiendo los n
+        inicios (independientes y de igual costo) entre hilos con prange.
+        Todos los inicios comparten las listas de vecinos ordenadas.
+        
+        Returns:
+            tuple: (longitudes, ciclos) donde la fila s corresponde al inicio s
+        """
+        n = D.shape[0]
+        longitudes = np.empty(n)
+        ciclos = np.empty((n, n), np.int64)
+        visitadas = np.zeros((n, n), np.bool_)  # una fila por inicio
+        for s in prange(n):
+            longitudes[s] = _nn_into_ordenado(D, vecinos, s, visitadas[s], ciclos[s])
+        return longitudes, ciclos
+
+
+def _nn_numpy(D, inicio):
+    """
+    Vecino Más Cercano con NumPy, sin salida ni historial: solo argmin y
+    actualización en cada paso.
+    
+    Returns:
+        list: Ciclo como lista de índices
+    """
+    n = D.shape[0]
+    activas = np.delete(np.arange(n), inicio)
+    ciclo = np.empty(n, dtype=np.int64)
+    ciclo[0] = actual = inicio
+    for pos in range(1, n):
+        m = n - pos
+        k = D[actual, activas[:m]].argmin()
+        ciclo[pos] = actual = activas[k]
+        activas[k:m - 1] = activas[k + 1:m]
+    return ciclo.tolist()
+
+
+def construir_matriz(coords):
+    """
+    Construye la matriz de distancias euclidianas a partir de las coordenadas.
+    
+    Args:
+        coords: Arreglo (n, 2) de coordenadas
+    
+    Returns:
+        numpy.ndarray: Matriz n×n de distancias (SciPy si está disponible,
+                       si no broadcasting de NumPy)
+    """
+    return construir_matriz_distancias(np.asarray(coords, dtype=np.float64), metodo='euclid')
+
+
+def vecino_mas_cercano(ciudades, matriz_dist=None, ciudad_inicio=0, verbose=True,
+                       registrar_historial=None, dtype=np.float32, medir_tiempo=True):
     """
     Implementa la heurística del Vecino Más Cercano (Nearest Neighbor).
     
@@ -16,21 +173,66 @@ def vecino_mas_cercano(ciudades, matriz_dist, ciudad_inicio=0, verbose=True):
     3. Regresar a ciudad_inicio
     
     Args:
-        ciudades: Lista de ciudades
-        matriz_dist: Matriz de distancias
+        ciudades: Lista de ciudades, o tupla (coords, nombres)
+        matriz_dist: Matriz de distancias (si es None, se construye desde las
+                     coordenadas con construir_matriz)
         ciudad_inicio: Índice de la ciudad inicial (default: 0)
         verbose: Si True, muestra el proceso paso a paso
+        registrar_historial: Si True, guarda cada paso (PasoNN) para la animación
+                             (por defecto, igual que verbose)
+        dtype: Tipo con el que se comparan las distancias al elegir la ciudad
+               más cercana (np.float32 por defecto: la mitad de memoria
+               recorrida). Las longitudes se suman siempre en float64;
+               use np.float64 si hay distancias casi empatadas.
+        medir_tiempo: Si False, no se mide el tiempo y 'tiempo_ejecucion' es 0.0
     
     Returns:
-        dict: Contiene 'ciclo', 'longitud', 'tiempo_ejecucion' e 'historial' (para visualización)
+        dict: Contiene 'ciclo', 'longitud', 'tiempo_ejecucion' e 'historial' (para visualización;
+              vacío si registrar_historial es False)
     """
-    n = len(ciudades)
-    inicio_tiempo = time.time()
+    if registrar_historial is None:
+        registrar_historial = verbose
+    # Sin salida ni historial no hace falta nada más que el recorrido
+    ruta_rapida = not verbose and not registrar_historial
+    
+    # Coordenadas contiguas y nombres en listas paralelas (conversión única)
+    coords, nombres = ciudades_a_soa(ciudades)
+    n = len(nombres)
+    inicio_tiempo = perf_counter() if medir_tiempo else None
     
-    # Inicializar
-    visitadas = [False] * n
-    ciclo = [ciudad_inicio]
-    visitadas[ciudad_inicio] = True
+    if matriz_dist is None:
+        matriz_dist = construir_matriz(coords)
+    
+    # Sin copia si ya es un ndarray float64
+    matriz_dist = np.asarray(matriz_dist, dtype=np.float64)
+    # Copia reducida solo para las comparaciones del recorrido
+    D = np.ascontiguousarray(matriz_dist, dtype=dtype)
+    
+    # Ruta rápida: núcleo compilado si hay Numba, si no el bucle mínimo de NumPy
+    if ruta_rapida:
+        if NUMBA_DISPONIBLE:
+            ciclo = recorrido_nn_compilado(D, ciudad_inicio)[0].tolist()
+        else:
+            ciclo = _nn_numpy(D, ciudad_inicio)
+        # Un solo gather de las n aristas (i → siguiente) y una suma en C
+        c = np.asarray(ciclo, dtype=np.intp)
+        longitud_total = matriz_dist[c, np.roll(c, -1)].sum()
+        return {
+            'ciclo': ciclo,
+            'longitud': float(longitud_total),
+            'tiempo_ejecucion': perf_counter() - inicio_tiempo if medir_tiempo else 0.0,
+            'historial': []
+        }
+    
+    # Inicializar: las m primeras posiciones de 'activas' son las ciudades
+    # aún no visitadas, en orden creciente (al visitar una, las siguientes se
+    # corren un lugar; así argmin desempata por el menor índice, como el núcleo)
+    activas = np.delete(np.arange(n), ciudad_inicio)
+    m = n - 1
+    # Ciclo preasignado y llenado por posición (pos = ciudades ya en el ciclo)
+    ciclo = np.empty(n, dtype=np.int64)
+    ciclo[0] = ciudad_inicio
+    pos = 1
     longitud_total = 0.0
     historial = []  # Para visualización
     
@@ -38,7 +240,7 @@ def vecino_mas_cercano(ciudades, matriz_dist, ciudad_inicio=0, verbose=True):
         print(f"\n{'='*60}")
         print(f"HEURÍSTICA DEL VECINO MÁS CERCANO")
         print(f"{'='*60}")
-        print(f"Ciudad inicial: {ciudades[ciudad_inicio]['nombre']}")
+        print(f"Ciudad inicial: {nombres[ciudad_inicio]}")
         print(f"Ciudades totales: {n}")
         print(f"{'='*60}\n")
     
@@ -46,61 +248,49 @@ def vecino_mas_cercano(ciudades, matriz_dist, ciudad_inicio=0, verbose=True):
     
     # Construir el ciclo
     for paso in range(n - 1):
-        mejor_distancia = float('inf')
-        mejor_ciudad = None
-        
-        # Buscar la ciudad no visitada más cercana
-        for ciudad in range(n):
-            if not visitadas[ciudad]:
-                distancia = matriz_dist[ciudad_actual][ciudad]
-                if distancia < mejor_distancia:
-                    mejor_distancia = distancia
-                    mejor_ciudad = ciudad
+        # Buscar la ciudad no visitada más cercana entre las m activas
+        k = int(D[ciudad_actual, activas[:m]].argmin())
+        mejor_ciudad = int(activas[k])
+        mejor_distancia = float(matriz_dist[ciudad_actual, mejor_ciudad])
         
         # Viajar a la ciudad más cercana
-        ciclo.append(mejor_ciudad)
-        visitadas[mejor_ciudad] = True
+        ciclo[pos] = mejor_ciudad
+        pos += 1
+        activas[k:m - 1] = activas[k + 1:m]
+        m -= 1
         longitud_total += mejor_distancia
         
         if verbose:
-            print(f"Paso {paso + 1}: {ciudades[ciudad_actual]['nombre']} → "
-                  f"{ciudades[mejor_ciudad]['nombre']} (distancia: {mejor_distancia:.4f})")
+            print(f"Paso {paso + 1}: {nombres[ciudad_actual]} → "
+                  f"{nombres[mejor_ciudad]} (distancia: {mejor_distancia:.4f})")
         
         # Guardar estado para visualización
-        historial.append({
-            'ciclo_parcial': ciclo.copy(),
-            'ciudad_origen': ciudad_actual,
-            'ciudad_destino': mejor_ciudad,
-            'distancia': mejor_distancia,
-            'longitud_acumulada': longitud_total,
-            'paso': paso + 1
-        })
+        if registrar_historial:
+            historial.append(PasoNN(paso + 1, ciudad_actual, mejor_ciudad,
+                                    mejor_distancia, longitud_total))
         
         ciudad_actual = mejor_ciudad
     
     # Regresar a la ciudad inicial
-    distancia_regreso = matriz_dist[ciudad_actual][ciudad_inicio]
+    distancia_regreso = float(matriz_dist[ciudad_actual, ciudad_inicio])
     longitud_total += distancia_regreso
     
     if verbose:
-        print(f"Paso {n}: {ciudades[ciudad_actual]['nombre']} → "
-              f"{ciudades[ciudad_inicio]['nombre']} (distancia: {distancia_regreso:.4f})")
+        print(f"Paso {n}: {nombres[ciudad_actual]} → "
+              f"{nombres[ciudad_inicio]} (distancia: {distancia_regreso:.4f})")
         print(f"\n{'='*60}")
         print(f"SOLUCIÓN HEURÍSTICA ENCONTRADA")
         print(f"{'='*60}")
-        print(f"Ciclo πNN: {' → '.join([ciudades[i]['nombre'] for i in ciclo])} → {ciudades[ciudad_inicio]['nombre']}")
+        print(f"Ciclo πNN: {' → '.join([nombres[i] for i in ciclo])} → {nombres[ciudad_inicio]}")
         print(f"Longitud LNN: {longitud_total:.4f}")
     
-    historial.append({
-        'ciclo_parcial': ciclo + [ciudad_inicio],
-        'ciudad_origen': ciudad_actual,
-        'ciudad_destino': ciudad_inicio,
-        'distancia': distancia_regreso,
-        'longitud_acumulada': longitud_total,
-        'paso': n
-    })
+    ciclo = ciclo.tolist()
+    
+    if registrar_historial:
+        historial.append(PasoNN(n, ciudad_actual, ciudad_inicio,
+                                distancia_regreso, longitud_total))
     
-    tiempo_ejecucion = time.time() - inicio_tiempo
+    tiempo_ejecucion = perf_counter() - inicio_tiempo if medir_tiempo else 0.0
     
     if verbose:
         print(f"Tiempo de ejecución: {tiempo_ejecucion:.6f} segundos")
@@ -114,19 +304,32 @@ def vecino_mas_cercano(ciudades, matriz_dist, ciudad_inicio=0, verbose=True):
     }
 
 
-def vecino_mas_cercano_multi_inicio(ciudades, matriz_dist, verbose=False):
+def vecino_mas_cercano_multi_inicio(ciudades, matriz_dist=None, verbose=False,
+                                    dtype=np.float32):
     """
     Ejecuta la heurística NN desde todas las ciudades posibles y retorna la mejor.
     
     Args:
-        ciudades: Lista de ciudades
-        matriz_dist: Matriz de distancias
+        ciudades: Lista de ciudades, o tupla (coords, nombres)
+        matriz_dist: Matriz de distancias (si es None, se construye desde las
+                     coordenadas con construir_matriz)
         verbose: Si True, muestra resultados de cada inicio
+        dtype: Tipo con el que se comparan las distancias, como en
+               vecino_mas_cercano (cada inicio recorre el mismo ciclo que
+               una ejecución individual con el mismo dtype)
     
     Returns:
         dict: Mejor solución encontrada entre todos los inicios
+              ('tiempo_ejecucion' es el tiempo total de los n inicios)
     """
-    n = len(ciudades)
+    inicio_tiempo = perf_counter()
+    ciudades = ciudades_a_soa(ciudades)
+    nombres = ciudades[1]
+    n = len(nombres)
+    
+    # Se construye una sola vez y se comparte entre todos los inicios
+    if matriz_dist is None:
+        matriz_dist = construir_matriz(ciudades[0])
     mejor_solucion = None
     mejor_longitud = float('inf')
     
@@ -136,15 +339,46 @@ def vecino_mas_cercano_multi_inicio(ciudades, matriz_dist, verbose=False):
         print(f"{'='*60}")
         print(f"Evaluando desde {n} ciudades iniciales diferentes...\n")
     
-    for inicio in range(n):
-        solucion = vecino_mas_cercano(ciudades, matriz_dist, ciudad_inicio=inicio, verbose=False)
+    if NUMBA_DISPONIBLE:
+        matriz_dist = np.ascontiguousarray(matriz_dist, dtype=np.float64)
+        
+        # Vecinos de cada ciudad ordenados por distancia (una sola vez para los
+        # n inicios; el orden estable desempata por índice, como el recorrido).
+        # Se ordena en dtype para comparar igual que una ejecución individual
+        vecinos = np.argsort(matriz_dist.astype(dtype, copy=False), axis=1, kind='stable')
+        
+        # Todos los inicios en paralelo, con buffers asignados una sola vez.
+        # Las longitudes se suman en float64 igual que en la ruta rápida de
+        # vecino_mas_cercano (un gather por ciclo), para que coincidan
+        ciclos = _nn_todos_los_inicios(matriz_dist, vecinos)[1]
+        longitudes = matriz_dist[ciclos, np.roll(ciclos, -1, axis=1)].sum(axis=1)
         
         if verbose:
-            print(f"Inicio desde {ciudades[inicio]['nombre']:15} → Longitud: {solucion['longitud']:.4f}")
+            for inicio in range(n):
+                print(f"Inicio desde {nombres[inicio]:15} → Longitud: {longitudes[inicio]:.4f}")
         
-        if solucion['longitud'] < mejor_longitud:
-            mejor_longitud = solucion['longitud']
-            mejor_solucion = solucion
+        mejor = int(longitudes.argmin())
+        mejor_longitud = float(longitudes[mejor])
+        mejor_solucion = {
+            'ciclo': ciclos[mejor].tolist(),
+            'longitud': mejor_longitud,
+            'historial': []
+        }
+    else:
+        # Cada inicio sin medición propia: se mide el total de los n inicios
+        for inicio in range(n):
+            solucion = vecino_mas_cercano(ciudades, matriz_dist, ciudad_inicio=inicio,
+                                          verbose=False, registrar_historial=False,
+                                          dtype=dtype, medir_tiempo=False)
+            
+            if verbose:
+                print(f"Inicio desde {nombres[inicio]:15} → Longitud: {solucion['longitud']:.4f}")
+            
+            if solucion['longitud'] < mejor_longitud:
+                mejor_longitud = solucion['longitud']
+                mejor_solucion = solucion
+    
+    mejor_solucion['tiempo_ejecucion'] = perf_counter() - inicio_tiempo
     
     if verbose:
         print(f"\n{'='*60}")
@@ -2,15 +2,37 @@
 Módulo para generar visualizaciones y animaciones del TSP.
 Genera gráficos del proceso de búsqueda y ciclos encontrados.
 """
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
-from matplotlib.patches import FancyArrowPatch
-import numpy as np
 import os
+from operator import itemgetter
+
+# Conversiones recientes de listas de ciudades, por identidad del objeto:
+# id(ciudades) -> (ciudades, (coords, nombres))
+_cache_soa = {}
+_TAM_CACHE_SOA = 8
+
+
+def _extraer_soa(ciudades):
+    """
+    ciudades_a_soa con memoria: la misma lista de ciudades se convierte una
+    sola vez aunque se dibuje varias veces. Se guarda una referencia a la
+    lista para que su id no pueda reutilizarse mientras esté en la caché
+    (la lista no debe modificarse después de dibujarla).
+    """
+    if isinstance(ciudades, tuple):
+        return ciudades
+    
+    entrada = _cache_soa.get(id(ciudades))
+    if entrada is None or entrada[0] is not ciudades:
+        from distance_calculator import ciudades_a_soa
+        if len(_cache_soa) >= _TAM_CACHE_SOA:
+            _cache_soa.pop(next(iter(_cache_soa)))
+        entrada = _cache_soa[id(ciudades)] = (ciudades, ciudades_a_soa(ciudades))
+    return entrada[1]
 
 
 def configurar_estilo():
     """Configura el estilo visual de los gráficos."""
+    import matplotlib.pyplot as plt
     plt.style.use('seaborn-v0_8-darkgrid')
     plt.rcParams['figure.figsize'] = (12, 8)
     plt.rcParams['font.size'] = 10
@@ -21,23 +43,26 @@ def plot_ciudades(ciudades, ax=None, mostrar=False):
     Dibuja las ciudades en un gráfico.
     
     Args:
-        ciudades: Lista de ciudades con coordenadas
+        ciudades: Lista de ciudades, o tupla (coords, nombres)
         ax: Axes de matplotlib (opcional)
         mostrar: Si True, muestra el gráfico
     
     Returns:
         matplotlib.axes.Axes: Objeto axes con las ciudades dibujadas
     """
+    import matplotlib.pyplot as plt
+    
     if ax is None:
         fig, ax = plt.subplots(figsize=(12, 8))
     
     # Extraer coordenadas
-    lats = [c['coords'][0] for c in ciudades]
-    lons = [c['coords'][1] for c in ciudades]
-    nombres = [c['nombre'] for c in ciudades]
+    coords, nombres = _extraer_soa(ciudades)
+    lats = coords[:, 0]
+    lons = coords[:, 1]
     
     # Dibujar ciudades
-    ax.scatter(lons, lats, c='red', s=200, zorder=5, edgecolors='black', linewidth=2)
+    ax.scatter(lons, lats, c='red', s=200, zorder=5, edgecolors='black', linewidth=2,
+               rasterized=True)
     
     # Etiquetar ciudades
     for i, nombre in enumerate(nombres):
@@ -57,13 +82,107 @@ def plot_ciudades(ciudades, ax=None, mostrar=False):
     return ax
 
 
+def _submuestrear(frames, max_frames):
+    """
+    Selecciona max_frames elementos equiespaciados de la lista (incluye
+    siempre el primero y el último). itemgetter arma la selección en C.
+    """
+    import numpy as np
+    
+    if len(frames) <= max_frames:
+        return frames
+    indices = np.linspace(0, len(frames) - 1, max_frames, dtype=int).tolist()
+    seleccion = itemgetter(*indices)(frames)
+    return list(seleccion) if len(indices) > 1 else [seleccion]
+
+
+def _segmentos_ciclo(coords, ciclo, cerrar=True):
+    """
+    Construye los segmentos (m, 2, 2) de un ciclo en orden (lon, lat).
+    
+    Args:
+        coords: Arreglo (n, 2) de coordenadas (lat, lon)
+        ciclo: Secuencia de índices de ciudades
+        cerrar: Si True, agrega la arista de regreso al inicio
+    
+    Returns:
+        numpy.ndarray: Segmentos listos para un LineCollection
+    """
+    import numpy as np
+    
+    idx = np.asarray(ciclo, dtype=np.intp)
+    puntos = coords[:, ::-1]
+    destino = np.roll(idx, -1) if cerrar else idx[1:]
+    origen = idx if cerrar else idx[:-1]
+    return np.stack([puntos[origen], puntos[destino]], axis=1)
+
+
+def _puntas_flecha(segmentos):
+    """Posición (punto medio) y dirección unitaria de la flecha de cada segmento."""
+    import numpy as np
+    
+    medios = segmentos.mean(axis=1)
+    delta = segmentos[:, 1] - segmentos[:, 0]
+    # Las aristas de longitud cero (ciudades repetidas, ciclo de una ciudad)
+    # quedan con dirección (0, 0): sin flecha en vez de NaN
+    norma = np.hypot(delta[:, 0], delta[:, 1])[:, None]
+    np.divide(delta, norma, out=delta, where=norma > 0)
+    return medios, delta
+
+
+def _dibujar_aristas(ax, segmentos, colores, anchos=2, alpha=0.7, flechas=True):
+    """
+    Dibuja todas las aristas con un único LineCollection (y, opcionalmente,
+    las puntas de flecha con un único quiver) en lugar de un artista por arista.
+    
+    Args:
+        ax: Axes de matplotlib
+        segmentos: Arreglo (m, 2, 2) de segmentos
+        colores: Color, o lista con un color por segmento
+        anchos: Ancho de línea, o lista con un ancho por segmento
+        alpha: Transparencia de las aristas
+        flechas: Si True, dibuja la dirección del recorrido en cada arista
+    
+    Returns:
+        tuple: (LineCollection, Quiver o None)
+    """
+    from matplotlib.collections import LineCollection
+    
+    # Rasterizadas: en formatos vectoriales (PDF/SVG) cientos de aristas pesan poco
+    lc = LineCollection(segmentos, colors=colores, linewidths=anchos,
+                        alpha=alpha, zorder=3, rasterized=True)
+    ax.add_collection(lc)
+    
+    puntas = None
+    if flechas and len(segmentos):
+        medios, delta = _puntas_flecha(segmentos)
+        puntas = ax.quiver(medios[:, 0], medios[:, 1], delta[:, 0], delta[:, 1],
+                           color=colores, alpha=alpha, angles='xy', pivot='mid',
+                           scale=40, width=0.004, headwidth=5, headlength=6,
+                           headaxislength=5, zorder=4, rasterized=True)
+    return lc, puntas
+
+
+def _actualizar_aristas(lc, puntas, segmentos):
+    """
+    Reemplaza los segmentos de un LineCollection (y de su quiver) ya dibujado.
+    El quiver conserva su número de flechas, así que segmentos debe tener
+    tantas filas como flechas se crearon.
+    """
+    lc.set_segments(segmentos)
+    if puntas is not None:
+        medios, delta = _puntas_flecha(segmentos)
+        puntas.set_offsets(medios)
+        puntas.set_UVC(delta[:, 0], delta[:, 1])
+
+
 def plot_ciclo(ciudades, ciclo, longitud, titulo="Ciclo Hamiltoniano", 
-               color='blue', ax=None, mostrar=False, guardar=None):
+               color='blue', ax=None, mostrar=False, guardar=None, dpi=100):
     """
     Dibuja un ciclo Hamiltoniano completo.
     
     Args:
-        ciudades: Lista de ciudades
+        ciudades: Lista de ciudades, o tupla (coords, nombres)
         ciclo: Lista de índices del ciclo
         longitud: Longitud total del ciclo
         titulo: Título del gráfico
@@ -71,36 +190,30 @@ def plot_ciclo(ciudades, ciclo, longitud, titulo="Ciclo Hamiltoniano",
         ax: Axes de matplotlib (opcional)
         mostrar: Si True, muestra el gráfico
         guardar: Ruta donde guardar la figura (opcional)
+        dpi: Resolución al guardar (100 para gráficos intermedios; use 150
+             para las figuras finales del informe)
     
     Returns:
         matplotlib.axes.Axes: Objeto axes con el ciclo dibujado
     """
+    import matplotlib.pyplot as plt
+    
     if ax is None:
         fig, ax = plt.subplots(figsize=(12, 8))
     
     # Dibujar ciudades
-    plot_ciudades(ciudades, ax=ax)
+    coords, nombres = _extraer_soa(ciudades)
+    plot_ciudades((coords, nombres), ax=ax)
     
     # Dibujar aristas del ciclo
-    n = len(ciclo)
-    for i in range(n):
-        ciudad_origen = ciclo[i]
-        ciudad_destino = ciclo[(i + 1) % n]
-        
-        coord_origen = ciudades[ciudad_origen]['coords']
-        coord_destino = ciudades[ciudad_destino]['coords']
-        
-        # Dibujar flecha
-        ax.annotate('', xy=(coord_destino[1], coord_destino[0]),
-                   xytext=(coord_origen[1], coord_origen[0]),
-                   arrowprops=dict(arrowstyle='->', lw=2, color=color, alpha=0.7))
+    _dibujar_aristas(ax, _segmentos_ciclo(coords, ciclo), color)
     
     ax.set_title(f"{titulo}\nLongitud: {longitud:.4f}", 
                 fontsize=14, fontweight='bold', pad=20)
     
     if guardar:
-        plt.tight_layout()
-        plt.savefig(guardar, dpi=150, bbox_inches='tight')
+        ax.figure.tight_layout()
+        ax.figure.savefig(guardar, dpi=dpi, bbox_inches='tight')
         print(f"✓ Gráfico guardado: {guardar}")
     
     if mostrar:
@@ -115,57 +228,56 @@ def crear_animacion_exhaustiva(ciudades, historial, fps=10, guardar=None):
     Crea una animación del proceso de búsqueda exhaustiva.
     
     Args:
-        ciudades: Lista de ciudades
+        ciudades: Lista de ciudades, o tupla (coords, nombres)
         historial: Lista de estados durante la búsqueda
         fps: Frames por segundo
         guardar: Ruta donde guardar la animación (opcional)
     
     Returns:
-        matplotlib.animation.FuncAnimation: Objeto de animación
+        matplotlib.animation.FuncAnimation: Objeto de animación (None si el
+        historial no tiene ningún frame)
     """
-    configurar_estilo()
-    fig, ax = plt.subplots(figsize=(14, 10))
-    
     # Seleccionar frames clave para la animación (solo los mejores)
     frames_mejores = [h for h in historial if h['es_mejor']]
+    if not frames_mejores:
+        print("El historial está vacío: no se genera la animación de búsqueda exhaustiva")
+        return None
+    
+    import matplotlib.pyplot as plt
+    import matplotlib.animation as animation
+    
+    configurar_estilo()
+    fig, ax = plt.subplots(figsize=(14, 10))
+    coords, nombres = _extraer_soa(ciudades)
     
     # Si hay demasiados frames, submuestrear
-    if len(frames_mejores) > 100:
-        indices = np.linspace(0, len(frames_mejores) - 1, 100, dtype=int)
-        frames_mejores = [frames_mejores[i] for i in indices]
+    frames_mejores = _submuestrear(frames_mejores, 100)
     
     print(f"Generando animación con {len(frames_mejores)} frames...")
     
+    # Artistas estáticos (ciudades y etiquetas) y persistentes (aristas, título):
+    # se crean una sola vez y cada frame solo actualiza sus datos
+    plot_ciudades((coords, nombres), ax=ax)
+    lc, puntas = _dibujar_aristas(ax, _segmentos_ciclo(coords, frames_mejores[0]['ciclo']),
+                                  'blue', alpha=0.6)
+    titulo = ax.set_title('', fontsize=14, fontweight='bold', pad=20)
+    
     def actualizar(frame_num):
-        ax.clear()
         estado = frames_mejores[frame_num]
         ciclo = estado['ciclo']
         longitud = estado['longitud']
         iteracion = estado['iteracion']
         
-        # Dibujar ciudades
-        plot_ciudades(ciudades, ax=ax)
-        
         # Dibujar ciclo actual
-        n = len(ciclo)
-        for i in range(n):
-            ciudad_origen = ciclo[i]
-            ciudad_destino = ciclo[(i + 1) % n]
-            
-            coord_origen = ciudades[ciudad_origen]['coords']
-            coord_destino = ciudades[ciudad_destino]['coords']
-            
-            ax.annotate('', xy=(coord_destino[1], coord_destino[0]),
-                       xytext=(coord_origen[1], coord_origen[0]),
-                       arrowprops=dict(arrowstyle='->', lw=2, color='blue', alpha=0.6))
+        _actualizar_aristas(lc, puntas, _segmentos_ciclo(coords, ciclo))
         
         progreso = (frame_num + 1) / len(frames_mejores) * 100
-        ax.set_title(f"BÚSQUEDA EXHAUSTIVA - Progreso: {progreso:.1f}%\n"
-                    f"Iteración: {iteracion:,} | Mejor longitud actual: {longitud:.4f}",
-                    fontsize=14, fontweight='bold', pad=20)
+        titulo.set_text(f"BÚSQUEDA EXHAUSTIVA - Progreso: {progreso:.1f}%\n"
+                        f"Iteración: {iteracion:,} | Mejor longitud actual: {longitud:.4f}")
+        return lc, puntas, titulo
     
     anim = animation.FuncAnimation(fig, actualizar, frames=len(frames_mejores),
-                                  interval=1000//fps, repeat=True)
+                                  interval=1000//fps, repeat=True, blit=True)
     
     if guardar:
         print(f"Guardando animación (esto puede tomar varios minutos)...")
@@ -176,77 +288,96 @@ def crear_animacion_exhaustiva(ciudades, historial, fps=10, guardar=None):
     return anim
 
 
-def crear_animacion_nn(ciudades, historial, fps=2, guardar=None):
+def crear_animacion_nn(ciudades, historial, ciclo_final, fps=2, guardar=None, max_frames=100):
     """
     Crea una animación del proceso de Vecino Más Cercano.
     
     Args:
-        ciudades: Lista de ciudades
-        historial: Lista de pasos del algoritmo
+        ciudades: Lista de ciudades, o tupla (coords, nombres)
+        historial: Lista de pasos del algoritmo (PasoNN)
+        ciclo_final: Ciclo completo encontrado; el ciclo parcial de cada
+                     paso se obtiene recortándolo
         fps: Frames por segundo
         guardar: Ruta donde guardar la animación (opcional)
+        max_frames: Máximo de frames; si hay más pasos, se submuestrean
     
     Returns:
         matplotlib.animation.FuncAnimation: Objeto de animación
     """
+    import matplotlib.pyplot as plt
+    import matplotlib.animation as animation
+    from matplotlib.colors import to_rgba
+    import numpy as np
+    
     configurar_estilo()
     fig, ax = plt.subplots(figsize=(14, 10))
+    coords, nombres = _extraer_soa(ciudades)
+    n = len(nombres)
+    
+    # Si hay demasiados pasos, submuestrear (se conserva siempre el último
+    # paso, que cierra el ciclo)
+    historial = _submuestrear(historial, max_frames)
     
     print(f"Generando animación Vecino Más Cercano con {len(historial)} frames...")
     
+    lats = coords[:, 0]
+    lons = coords[:, 1]
+    
+    # Artistas persistentes: se crean una sola vez y cada frame solo
+    # actualiza colores, tamaños, segmentos y texto
+    verde, gris = to_rgba('green'), to_rgba('lightgray')
+    etiqueta_verde, etiqueta_gris = to_rgba('lightgreen', 0.7), to_rgba('lightgray', 0.7)
+    azul, rojo, transparente = to_rgba('blue', 0.7), to_rgba('red', 0.7), (0, 0, 0, 0)
+    
+    scat = ax.scatter(lons, lats, c=[gris] * n, s=150, zorder=5,
+                      edgecolors='black', linewidth=2, rasterized=True)
+    etiquetas = [ax.annotate(nombre, (lons[i], lats[i]),
+                             xytext=(5, 5), textcoords='offset points',
+                             fontsize=11, fontweight='bold',
+                             bbox=dict(boxstyle='round,pad=0.3', facecolor=etiqueta_gris))
+                 for i, nombre in enumerate(nombres)]
+    
+    # Las n aristas del ciclo cerrado se calculan una vez: el paso p muestra
+    # las p primeras, y las aún no recorridas quedan transparentes
+    ciclo_cerrado = list(ciclo_final) + [ciclo_final[0]]
+    segmentos_final = _segmentos_ciclo(coords, ciclo_final)
+    lc, puntas = _dibujar_aristas(ax, segmentos_final, [transparente] * n, alpha=None)
+    
+    ax.set_xlabel('Longitud', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Latitud', fontsize=12, fontweight='bold')
+    titulo = ax.set_title('', fontsize=14, fontweight='bold', pad=20)
+    ax.grid(True, alpha=0.3)
+    
     def actualizar(frame_num):
-        ax.clear()
         estado = historial[frame_num]
-        ciclo_parcial = estado['ciclo_parcial']
-        paso = estado['paso']
-        longitud_acum = estado['longitud_acumulada']
-        
-        # Dibujar ciudades
-        lats = [c['coords'][0] for c in ciudades]
-        lons = [c['coords'][1] for c in ciudades]
-        nombres = [c['nombre'] for c in ciudades]
+        paso = estado.paso
+        longitud_acum = estado.longitud_acumulada
+        ciclo_parcial = ciclo_cerrado[:paso + 1]
         
         # Ciudades visitadas y no visitadas
-        visitadas = set(ciclo_parcial[:-1]) if len(ciclo_parcial) > 1 and ciclo_parcial[-1] == ciclo_parcial[0] else set(ciclo_parcial)
+        visitadas = np.zeros(n, dtype=bool)
+        visitadas[ciclo_parcial] = True
+        scat.set_facecolors(np.where(visitadas[:, None], verde, gris))
+        scat.set_sizes(np.where(visitadas, 200, 150))
+        for i, etiqueta in enumerate(etiquetas):
+            etiqueta.get_bbox_patch().set_facecolor(etiqueta_verde if visitadas[i] else etiqueta_gris)
         
-        for i, nombre in enumerate(nombres):
-            color = 'green' if i in visitadas else 'lightgray'
-            size = 200 if i in visitadas else 150
-            ax.scatter(lons[i], lats[i], c=color, s=size, zorder=5, 
-                      edgecolors='black', linewidth=2)
-            
-            ax.annotate(nombre, (lons[i], lats[i]), 
-                       xytext=(5, 5), textcoords='offset points',
-                       fontsize=11, fontweight='bold',
-                       bbox=dict(boxstyle='round,pad=0.3', 
-                                facecolor='lightgreen' if i in visitadas else 'lightgray', 
-                                alpha=0.7))
+        # Aristas del ciclo parcial (última en rojo: la que se acaba de agregar);
+        # las posiciones restantes repiten la última arista de forma invisible
+        segmentos = segmentos_final[:paso]
+        m = len(segmentos)
+        colores = [azul] * (m - 1) + [rojo] + [transparente] * (n - m)
+        _actualizar_aristas(lc, puntas, np.concatenate([segmentos, np.repeat(segmentos[-1:], n - m, axis=0)]))
+        lc.set_colors(colores)
+        lc.set_linewidths([2] * (m - 1) + [3] + [2] * (n - m))
+        puntas.set_color(colores)
         
-        # Dibujar aristas del ciclo parcial
-        for i in range(len(ciclo_parcial) - 1):
-            ciudad_origen = ciclo_parcial[i]
-            ciudad_destino = ciclo_parcial[i + 1]
-            
-            coord_origen = ciudades[ciudad_origen]['coords']
-            coord_destino = ciudades[ciudad_destino]['coords']
-            
-            # Última arista en rojo (la que se acaba de agregar)
-            color = 'red' if i == len(ciclo_parcial) - 2 else 'blue'
-            width = 3 if i == len(ciclo_parcial) - 2 else 2
-            
-            ax.annotate('', xy=(coord_destino[1], coord_destino[0]),
-                       xytext=(coord_origen[1], coord_origen[0]),
-                       arrowprops=dict(arrowstyle='->', lw=width, color=color, alpha=0.7))
-        
-        ax.set_xlabel('Longitud', fontsize=12, fontweight='bold')
-        ax.set_ylabel('Latitud', fontsize=12, fontweight='bold')
-        ax.set_title(f"VECINO MÁS CERCANO - Paso {paso}/{len(ciudades)}\n"
-                    f"Longitud acumulada: {longitud_acum:.4f}",
-                    fontsize=14, fontweight='bold', pad=20)
-        ax.grid(True, alpha=0.3)
+        titulo.set_text(f"VECINO MÁS CERCANO - Paso {paso}/{n}\n"
+                        f"Longitud acumulada: {longitud_acum:.4f}")
+        return (scat, lc, puntas, titulo, *etiquetas)
     
     anim = animation.FuncAnimation(fig, actualizar, frames=len(historial),
-                                  interval=1000//fps, repeat=True)
+                                  interval=1000//fps, repeat=True, blit=True)
     
     if guardar:
         print(f"Guardando animación...")
@@ -257,20 +388,35 @@ def crear_animacion_nn(ciudades, historial, fps=2, guardar=None):
     return anim
 
 
-def comparar_soluciones(ciudades, ciclo_optimo, long_optima, ciclo_nn, long_nn, guardar=None):
+def comparar_soluciones(ciudades, ciclo_optimo, long_optima, ciclo_nn, long_nn, guardar=None,
+                        dpi=100, axes=None):
     """
     Crea una figura comparativa de ambas soluciones lado a lado.
     
     Args:
-        ciudades: Lista de ciudades
+        ciudades: Lista de ciudades, o tupla (coords, nombres)
         ciclo_optimo: Ciclo de búsqueda exhaustiva
         long_optima: Longitud óptima
         ciclo_nn: Ciclo de vecino más cercano
         long_nn: Longitud heurística
         guardar: Ruta donde guardar la figura (opcional)
+        dpi: Resolución al guardar (100 por defecto; 150 para el informe final)
+        axes: Par (ax1, ax2) de una figura existente (opcional); si se entrega,
+              no se crea figura ni se recalcula su diseño (tight_layout)
+    
+    Returns:
+        matplotlib.figure.Figure: Figura que contiene la comparación
     """
-    configurar_estilo()
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(18, 8))
+    import matplotlib.pyplot as plt
+    
+    propia = axes is None
+    if propia:
+        configurar_estilo()
+        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(18, 8))
+    else:
+        ax1, ax2 = axes
+        fig = ax1.figure
+    ciudades = _extraer_soa(ciudades)
     
     # Solución óptima
     plot_ciclo(ciudades, ciclo_optimo, long_optima, 
@@ -290,10 +436,12 @@ def comparar_soluciones(ciudades, ciclo_optimo, long_optima, ciclo_nn, long_nn,
                 f"L⋆ = {long_optima:.4f} | LNN = {long_nn:.4f}",
                 fontsize=16, fontweight='bold', y=0.98)
     
+    # El diseño de una figura ajena es responsabilidad de quien la creó
+    if propia:
+        fig.tight_layout()
+    
     if guardar:
-        plt.tight_layout()
-        plt.savefig(guardar, dpi=150, bbox_inches='tight')
+        fig.savefig(guardar, dpi=dpi, bbox_inches='tight')
         print(f"✓ Comparación guardada: {guardar}")
     
-    plt.tight_layout()
     return fig
@@ -0,0 +1,109 @@
+"""
+Verifica que las tres rutas de la búsqueda exhaustiva (kernel compilado,
+bloques de NumPy y recorrido en Python con historial) encuentren el mismo óptimo.
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, 'src'))
+sys.path.insert(0, RAIZ)
+
+import exhaustive_search
+from distance_calculator import ciudades_a_soa, construir_matriz_distancias
+from main import ciudades_12
+
+
+def _resolver(monkeypatch, ciudades, ruta):
+    """Ejecuta la búsqueda forzando una de las rutas: 'jit', 'numpy' o 'python'."""
+    if ruta == 'jit' and not exhaustive_search.NUMBA_DISPONIBLE:
+        pytest.skip("Numba no está instalado")
+    matriz = construir_matriz_distancias(ciudades)
+    if ruta == 'python':
+        n = len(ciudades)
+        ciclo, longitud, _, _ = exhaustive_search._busqueda_exhaustiva_python(
+            matriz, n, exhaustive_search.contar_ciclos_candidatos(n), False, False)
+        return {'ciclo_optimo': ciclo, 'longitud_optima': longitud}, matriz
+    if ruta == 'numpy':
+        monkeypatch.setattr(exhaustive_search, 'NUMBA_DISPONIBLE', False)
+    resultado = exhaustive_search.busqueda_exhaustiva(ciudades, matriz, verbose=False)
+    return resultado, matriz
+
+
+@pytest.mark.parametrize('n', [1, 2, 3, 5, 11, 12])
+def test_rutas_coinciden(monkeypatch, n):
+    ciudades = ciudades_12[:n]
+    longitudes = {}
+    for ruta in ('jit', 'numpy', 'python'):
+        with monkeypatch.context() as m:
+            resultado, matriz = _resolver(m, ciudades, ruta)
+        ciclo = resultado['ciclo_optimo']
+        assert sorted(ciclo) == list(range(n))
+        assert resultado['longitud_optima'] == pytest.approx(
+            exhaustive_search.calcular_longitud_ciclo(ciclo, matriz))
+        longitudes[ruta] = resultado['longitud_optima']
+
+    referencia = longitudes['numpy']
+    for ruta, longitud in longitudes.items():
+        assert longitud == pytest.approx(referencia), ruta
+
+
+def test_historial_no_cambia_el_resultado():
+    ciudades = ciudades_12[:8]
+    matriz = construir_matriz_distancias(ciudades)
+    sin_historial = exhaustive_search.busqueda_exhaustiva(ciudades, matriz, verbose=False)
+    con_historial = exhaustive_search.busqueda_exhaustiva(
+        ciudades, matriz, verbose=False, registrar_historial=True)
+    assert con_historial['ciclo_optimo'] == sin_historial['ciclo_optimo']
+    assert con_historial['ciclos_evaluados'] == sin_historial['ciclos_evaluados']
+    assert con_historial['historial'][-1]['longitud'] == pytest.approx(
+        con_historial['longitud_optima'])
+
+
+def test_acepta_tupla_coords_nombres(capsys):
+    ciudades = ciudades_12[:6]
+    matriz = construir_matriz_distancias(ciudades)
+    resultado = exhaustive_search.busqueda_exhaustiva(
+        ciudades_a_soa(ciudades), matriz, verbose=True)
+    assert resultado['ciclo_optimo'] == exhaustive_search.busqueda_exhaustiva(
+        ciudades, matriz, verbose=False)['ciclo_optimo']
+    assert ciudades[0]['nombre'] in capsys.readouterr().out
+
+
+@pytest.mark.parametrize('ruta', ['jit', 'numpy', 'python'])
+def test_matriz_asimetrica(monkeypatch, ruta):
+    if ruta == 'jit' and not exhaustive_search.NUMBA_DISPONIBLE:
+        pytest.skip("Numba no está instalado")
+    if ruta != 'jit':
+        monkeypatch.setattr(exhaustive_search, 'NUMBA_DISPONIBLE', False)
+
+    # Ir en un sentido es mucho más caro que en el otro: el óptimo es
+    # 0 → 4 → 3 → 2 → 1 y su reverso no debe descartarse
+    n = 5
+    matriz = np.ones((n, n)) * 10
+    np.fill_diagonal(matriz, 0)
+    for i in range(n):
+        matriz[(i + 1) % n, i] = 1
+    nombres = [str(i) for i in range(n)]
+
+    if ruta == 'python':
+        historial = exhaustive_search.historial_busqueda_exhaustiva(matriz)
+        ciclo, longitud = historial[-1]['ciclo'], historial[-1]['longitud']
+    else:
+        resultado = exhaustive_search.busqueda_exhaustiva(
+            (np.zeros((n, 2)), nombres), matriz, verbose=False)
+        ciclo, longitud = resultado['ciclo_optimo'], resultado['longitud_optima']
+        assert resultado['ciclos_candidatos'] == 24
+    assert ciclo == [0, 4, 3, 2, 1]
+    assert longitud == pytest.approx(n)
+
+
+def test_rechaza_demasiadas_ciudades():
+    n = exhaustive_search.MAX_CIUDADES + 1
+    nombres = [str(i) for i in range(n)]
+    with pytest.raises(ValueError):
+        exhaustive_search.busqueda_exhaustiva((np.zeros((n, 2)), nombres),
+                                              np.zeros((n, n)), verbose=False)
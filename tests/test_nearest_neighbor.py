@@ -0,0 +1,51 @@
+"""
+Verifica que las rutas del Vecino Más Cercano (núcleo compilado, bucle de
+NumPy y recorrido con historial) elijan la misma ciudad ante empates.
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, 'src'))
+
+import nearest_neighbor
+
+
+@pytest.mark.parametrize('numba', [True, False])
+@pytest.mark.parametrize('registrar_historial', [False, True])
+def test_empates_por_menor_indice(monkeypatch, numba, registrar_historial):
+    if numba and not nearest_neighbor.NUMBA_DISPONIBLE:
+        pytest.skip("Numba no está instalado")
+    monkeypatch.setattr(nearest_neighbor, 'NUMBA_DISPONIBLE', numba)
+
+    # Desde la ciudad 1, las ciudades 2 y 4 están a la misma distancia
+    coords = np.array([[2, 2], [2, 3], [1, 3], [0, 0], [3, 3]], dtype=float)
+    nombres = [str(i) for i in range(len(coords))]
+
+    resultado = nearest_neighbor.vecino_mas_cercano(
+        (coords, nombres), verbose=False, registrar_historial=registrar_historial)
+    assert resultado['ciclo'] == [0, 1, 2, 4, 3]
+
+
+@pytest.mark.parametrize('numba', [True, False])
+def test_multi_inicio_igual_a_inicios_individuales(monkeypatch, numba):
+    if numba and not nearest_neighbor.NUMBA_DISPONIBLE:
+        pytest.skip("Numba no está instalado")
+
+    # Distancias casi empatadas: float32 y float64 pueden elegir distinto
+    rng = np.random.default_rng(1)
+    coords = rng.integers(0, 6, (30, 2)) + rng.random((30, 2)) * 1e-7
+    nombres = [str(i) for i in range(len(coords))]
+
+    individuales = [
+        nearest_neighbor.vecino_mas_cercano((coords, nombres), ciudad_inicio=s, verbose=False)
+        for s in range(len(coords))]
+    mejor = min(individuales, key=lambda r: r['longitud'])
+
+    monkeypatch.setattr(nearest_neighbor, 'NUMBA_DISPONIBLE', numba)
+    resultado = nearest_neighbor.vecino_mas_cercano_multi_inicio((coords, nombres))
+    assert resultado['ciclo'] == mejor['ciclo']
+    assert resultado['longitud'] == mejor['longitud']